@@ -2,6 +2,10 @@
 """Authentication and authorization system"""
 
 import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 import jwt
 import bcrypt
 from datetime import datetime, timedelta
@@ -14,6 +18,9 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# Verified tokens are remembered (by SHA-256) until they expire
+TOKEN_CACHE_SIZE = 4096
+
 # Default admin credentials (change in production)
 DEFAULT_ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 DEFAULT_ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "Priya@2003")
@@ -29,6 +36,8 @@ class AuthManager:
             DEFAULT_ADMIN_PASSWORD.encode('utf-8'),
             bcrypt.gensalt()
         )
+        self._token_cache = OrderedDict()
+        self._token_cache_lock = threading.Lock()
     
     def verify_password(self, plain_password: str, hashed_password: bytes) -> bool:
         """Verify password against hash"""
@@ -55,9 +64,24 @@ class AuthManager:
     
     def verify_token(self, token: str) -> Optional[dict]:
         """Verify JWT token and return payload"""
+        key = hashlib.sha256(token.encode('utf-8')).digest()
+        with self._token_cache_lock:
+            cached = self._token_cache.get(key)
+            if cached is not None:
+                payload, exp = cached
+                if exp is None or exp > time.time():
+                    self._token_cache.move_to_end(key)
+                    return dict(payload)
+                # Expired - drop it and let jwt.decode report why
+                del self._token_cache[key]
+        
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            return payload
+            with self._token_cache_lock:
+                self._token_cache[key] = (payload, payload.get("exp"))
+                if len(self._token_cache) > TOKEN_CACHE_SIZE:
+                    self._token_cache.popitem(last=False)
+            return dict(payload)
         except jwt.ExpiredSignatureError as e:
             print(f"Token expired: {e}")
             return None
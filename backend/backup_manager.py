@@ -4,17 +4,92 @@
 import os
 import shutil
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List
 import gzip
+import hashlib
 import json
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 BACKUP_DIR = Path("backups")
 BACKUP_DIR.mkdir(exist_ok=True)
 
 DATABASE_FILE = "officer_priya_multi.db"
 
+# zstd level 3 compresses about as well as gzip at a fraction of the CPU;
+# gzip is used when zstandard isn't installed
+ZSTD_LEVEL = 3
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+
+
+# Backups are whole-file frames, so they are compressed without a
+# dictionary. Older backups may still reference one by dict id; those
+# dictionaries live next to the backups, one file per id.
+DICT_PREFIX = ".zstd-dict-"
+
+
+# Backup checksums are stored in the metadata as "<algorithm>:<hexdigest>"
+CHECKSUM_ALGORITHM = "sha256"
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+
+def _file_checksum(path: Path, algorithm: str = CHECKSUM_ALGORITHM) -> str:
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHECKSUM_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return f"{algorithm}:{digest.hexdigest()}"
+
+
+def _copy_database(src, dst):
+    """Copy a SQLite database through the backup API
+    
+    The database runs in WAL mode, so committed pages can still be in the
+    -wal file; copying the main file alone would miss them. Writing into
+    dst the same way keeps its own WAL and open connections consistent.
+    """
+    source = sqlite3.connect(str(src))
+    try:
+        target = sqlite3.connect(str(dst))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+
+def _load_dictionary(path: Path):
+    return zstandard.ZstdCompressionDict(path.read_bytes())
+
+
+def _decompress_to(backup_file: Path, f_out):
+    """Stream a compressed backup's contents into f_out"""
+    if backup_file.suffix == '.zst':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst backups")
+        with open(backup_file, 'rb') as f_in:
+            dict_id = zstandard.get_frame_parameters(f_in.read(18)).dict_id
+            f_in.seek(0)
+            
+            dict_data = None
+            if dict_id:
+                dict_path = backup_file.parent / f"{DICT_PREFIX}{dict_id}"
+                if not dict_path.exists():
+                    raise RuntimeError(f"zstd dictionary {dict_id} not found for {backup_file.name}")
+                dict_data = _load_dictionary(dict_path)
+            
+            zstandard.ZstdDecompressor(dict_data=dict_data).copy_stream(f_in, f_out)
+    else:
+        with gzip.open(backup_file, 'rb') as f_in:
+            shutil.copyfileobj(f_in, f_out)
+
 
 class BackupManager:
     """Manage database backups and recovery"""
@@ -22,13 +97,17 @@ class BackupManager:
     def __init__(self, db_path: str = DATABASE_FILE):
         self.db_path = db_path
         self.backup_dir = BACKUP_DIR
+        # (backup_dir mtime_ns, listing) from the last list_backups scan
+        self._listing = None
+        self._listing_lock = threading.Lock()
     
-    def create_backup(self, compress: bool = True) -> Optional[str]:
+    def create_backup(self, compress: bool = True, level: int = ZSTD_LEVEL) -> Optional[str]:
         """
         Create database backup
         
         Args:
             compress: Whether to compress the backup
+            level: zstd compression level (ignored when falling back to gzip)
             
         Returns:
             Path to backup file or None if failed
@@ -38,15 +117,25 @@ class BackupManager:
             backup_name = f"backup_{timestamp}.db"
             backup_path = self.backup_dir / backup_name
             
-            # Copy database file
-            shutil.copy2(self.db_path, backup_path)
+            # Snapshot the database, including pages still in its WAL
+            _copy_database(self.db_path, backup_path)
             
             # Compress if requested
+            compression = None
             if compress:
-                compressed_path = backup_path.with_suffix('.db.gz')
-                with open(backup_path, 'rb') as f_in:
-                    with gzip.open(compressed_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
+                if zstandard is not None:
+                    compression = 'zstd'
+                    compressed_path = backup_path.with_suffix('.db.zst')
+                    cctx = zstandard.ZstdCompressor(level=level, threads=-1)
+                    with open(backup_path, 'rb') as f_in:
+                        with open(compressed_path, 'wb') as f_out:
+                            cctx.copy_stream(f_in, f_out)
+                else:
+                    compression = 'gzip'
+                    compressed_path = backup_path.with_suffix('.db.gz')
+                    with open(backup_path, 'rb') as f_in:
+                        with gzip.open(compressed_path, 'wb') as f_out:
+                            shutil.copyfileobj(f_in, f_out)
                 
                 # Remove uncompressed file
                 backup_path.unlink()
@@ -57,6 +146,8 @@ class BackupManager:
                 'timestamp': timestamp,
                 'size': backup_path.stat().st_size,
                 'compressed': compress,
+                'compression': compression,
+                'checksum': _file_checksum(backup_path),
                 'original_db': self.db_path
             }
             
@@ -73,30 +164,57 @@ class BackupManager:
     
     def list_backups(self) -> List[dict]:
         """List all available backups"""
-        backups = []
+        # Creating, deleting or renaming a backup bumps the directory mtime,
+        # so an unchanged mtime means the last scan is still accurate
+        dir_mtime = os.stat(self.backup_dir).st_mtime_ns
+        with self._listing_lock:
+            if self._listing is not None and self._listing[0] == dir_mtime:
+                return list(self._listing[1])
+        
+        backups = self._scan_backups()
+        with self._listing_lock:
+            self._listing = (dir_mtime, backups)
+        return list(backups)
+    
+    def _scan_backups(self) -> List[dict]:
+        # One scandir pass; DirEntry caches stat results and the name set
+        # replaces a per-backup exists() check for the metadata file
+        with os.scandir(self.backup_dir) as it:
+            entries = {entry.name: entry for entry in it if entry.name.startswith("backup_")}
         
-        for backup_file in sorted(self.backup_dir.glob("backup_*.db*"), reverse=True):
-            if backup_file.suffix == '.json':
+        backups = []
+        for name in sorted(entries, reverse=True):
+            backup_file = self.backup_dir / name
+            if ".db" not in name or backup_file.suffix == '.json' or not entries[name].is_file():
                 continue
             
             metadata_file = backup_file.with_suffix('.json')
             metadata = {}
             
-            if metadata_file.exists():
+            if metadata_file.name in entries:
                 with open(metadata_file, 'r') as f:
                     metadata = json.load(f)
             
+            stat = entries[name].stat()
             backups.append({
-                'filename': backup_file.name,
+                'filename': name,
                 'path': str(backup_file),
-                'size': backup_file.stat().st_size,
-                'created': datetime.fromtimestamp(backup_file.stat().st_mtime).isoformat(),
-                'compressed': backup_file.suffix == '.gz',
+                'size': stat.st_size,
+                'created': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                'compressed': backup_file.suffix in COMPRESSED_SUFFIXES,
                 **metadata
             })
         
         return backups
     
+    def get_backup_file(self, name: str) -> Optional[Path]:
+        """Resolve a backup filename inside the backup directory"""
+        if Path(name).name != name or not name.startswith("backup_") or name.endswith(".json"):
+            return None
+        
+        backup_file = self.backup_dir / name
+        return backup_file if backup_file.is_file() else None
+    
     def restore_backup(self, backup_path: str, target_path: Optional[str] = None) -> bool:
         """
         Restore database from backup
@@ -114,21 +232,37 @@ class BackupManager:
                 print(f"❌ Backup file not found: {backup_path}")
                 return False
             
+            # Refuse to overwrite the database with a damaged backup (backups
+            # made before checksums were recorded are restored unchecked)
+            metadata_file = backup_file.with_suffix('.json')
+            if metadata_file.exists():
+                with open(metadata_file, 'r') as f:
+                    expected = json.load(f).get('checksum')
+                if expected and _file_checksum(backup_file, expected.split(':', 1)[0]) != expected:
+                    print(f"❌ Backup checksum mismatch: {backup_path}")
+                    return False
+            
             target = target_path or self.db_path
             
             # Create backup of current database before restoring
             if Path(target).exists():
                 current_backup = f"{target}.before_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                shutil.copy2(target, current_backup)
+                _copy_database(target, current_backup)
                 print(f"📦 Current database backed up to: {current_backup}")
             
-            # Decompress if needed
-            if backup_file.suffix == '.gz':
-                with gzip.open(backup_file, 'rb') as f_in:
-                    with open(target, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-            else:
-                shutil.copy2(backup_file, target)
+            # Decompress to a scratch file, then write it into the target
+            # through SQLite rather than over the file, so a stale -wal/-shm
+            # beside the target can't be replayed onto the restored data
+            restore_tmp = Path(f"{target}.restore_tmp")
+            try:
+                if backup_file.suffix in COMPRESSED_SUFFIXES:
+                    with open(restore_tmp, 'wb') as f_out:
+                        _decompress_to(backup_file, f_out)
+                else:
+                    shutil.copy2(backup_file, restore_tmp)
+                _copy_database(restore_tmp, target)
+            finally:
+                restore_tmp.unlink(missing_ok=True)
             
             print(f"✅ Database restored from: {backup_path}")
             return True
@@ -185,11 +319,10 @@ class BackupManager:
             backup_file = Path(backup_path)
             
             # Decompress to temp file if needed
-            if backup_file.suffix == '.gz':
+            if backup_file.suffix in COMPRESSED_SUFFIXES:
                 import tempfile
                 with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                    with gzip.open(backup_file, 'rb') as f_in:
-                        shutil.copyfileobj(f_in, tmp)
+                    _decompress_to(backup_file, tmp)
                     temp_path = tmp.name
             else:
                 temp_path = backup_path
@@ -205,7 +338,7 @@ class BackupManager:
             conn.close()
             
             # Clean up temp file
-            if backup_file.suffix == '.gz':
+            if backup_file.suffix in COMPRESSED_SUFFIXES:
                 os.unlink(temp_path)
             
             if result == 'ok':
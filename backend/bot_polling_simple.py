@@ -9,6 +9,8 @@ import requests
 from dotenv import load_dotenv
 from multi_user_database import MultiUserDatabase
 from user_repository import UserRepository, User
+from streak_calculator import streak_motivation
+from video_selector import SUBJECT_EMOJI
 from logger import app_logger
 
 load_dotenv()
@@ -85,20 +87,21 @@ def get_ai_response_with_context(user_message, chat_id, user_name="User"):
         
         if user:
             config = user_repo.get_user_config(user.id)
-            logs = user_repo.get_user_logs(user.id)
+            stats = user_repo.get_user_stats(user.id)
+            total = stats['total']
             
             if config:
                 user_context['streak'] = config.streak
                 user_context['day_count'] = config.day_count
                 user_context['first_name'] = user.first_name
-                user_context['total_days'] = len(logs)
+                user_context['total_days'] = total
                 
                 # Calculate completion rate
-                if logs:
-                    completed = sum(1 for log in logs if log.is_completed())
-                    user_context['completion_rate'] = (completed / len(logs)) * 100
+                if total:
+                    completed = stats['done']
+                    user_context['completion_rate'] = (completed / total) * 100
                     user_context['completed_days'] = completed
-                    user_context['pending_tasks'] = len(logs) - completed
+                    user_context['pending_tasks'] = total - completed
         
         # If asking about schedule or days per subject, fetch and include it
         if is_schedule_query or is_days_query:
@@ -414,14 +417,6 @@ def handle_schedule_command(bot_token, chat_id):
         send_message(bot_token, chat_id, "❌ Unable to fetch schedule. Please try again later.")
         return
     
-    emoji_map = {
-        'english': '🗣️',
-        'history': '🏛️',
-        'polity': '⚖️',
-        'geography': '🌍',
-        'economics': '💰'
-    }
-    
     msg = "📅 YOUR WEEKLY STUDY SCHEDULE\n"
     msg += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
     
@@ -431,7 +426,7 @@ def handle_schedule_command(bot_token, chat_id):
         
         if day['subjects']:
             for subject in day['subjects']:
-                emoji = emoji_map.get(subject, '📚')
+                emoji = SUBJECT_EMOJI.get(subject, '📚')
                 msg += f"{emoji} {subject.capitalize()}\n"
         else:
             msg += "⏭️ No subjects scheduled\n"
@@ -453,14 +448,6 @@ def handle_today_command(bot_token, chat_id):
         send_message(bot_token, chat_id, "❌ Unable to fetch schedule. Please try again later.")
         return
     
-    emoji_map = {
-        'english': '🗣️',
-        'history': '🏛️',
-        'polity': '⚖️',
-        'geography': '🌍',
-        'economics': '💰'
-    }
-    
     today = schedule_data['weekly_schedule'][0]
     
     msg = f"📅 TODAY'S SCHEDULE ({today['day_name']})\n"
@@ -468,7 +455,7 @@ def handle_today_command(bot_token, chat_id):
     
     if today['subjects']:
         for subject in today['subjects']:
-            emoji = emoji_map.get(subject, '📚')
+            emoji = SUBJECT_EMOJI.get(subject, '📚')
             msg += f"{emoji} {subject.capitalize()}\n"
         
         msg += f"\n⏰ Will be sent at {schedule_data['schedule_time']}\n\n"
@@ -487,14 +474,6 @@ def handle_tomorrow_command(bot_token, chat_id):
         send_message(bot_token, chat_id, "❌ Unable to fetch schedule. Please try again later.")
         return
     
-    emoji_map = {
-        'english': '🗣️',
-        'history': '🏛️',
-        'polity': '⚖️',
-        'geography': '🌍',
-        'economics': '💰'
-    }
-    
     tomorrow = schedule_data['weekly_schedule'][1]
     
     msg = f"📅 TOMORROW'S SCHEDULE ({tomorrow['day_name']})\n"
@@ -502,7 +481,7 @@ def handle_tomorrow_command(bot_token, chat_id):
     
     if tomorrow['subjects']:
         for subject in tomorrow['subjects']:
-            emoji = emoji_map.get(subject, '📚')
+            emoji = SUBJECT_EMOJI.get(subject, '📚')
             msg += f"{emoji} {subject.capitalize()}\n"
         
         msg += f"\n⏰ Will be sent at {schedule_data['schedule_time']}"
@@ -643,41 +622,19 @@ def main():
                             if user:
                                 print(f"   User found: {user.first_name} (ID: {user.id})")
                                 
-                                # Update log status
-                                from streak_calculator import StreakCalculator
-                                streak_calc = StreakCalculator()
-                                
-                                success = user_repo.update_user_log_status(user.id, day, status)
+                                # Update log status and streak
+                                new_streak = user_repo.update_log_status_and_streak(user.id, day, status)
+                                success = new_streak is not None
                                 print(f"   Update status: {success}")
                                 
                                 if success:
-                                    # Recalculate streak
-                                    logs = user_repo.get_user_logs(user.id)
-                                    config = user_repo.get_user_config(user.id)
-                                    new_streak = streak_calc.calculate_streak(logs)
-                                    config.streak = new_streak
-                                    user_repo.update_user_config(config)
-                                    
                                     print(f"   New streak: {new_streak}")
                                     
                                     # Send confirmation message
                                     if status == "DONE":
-                                        if new_streak == 1:
-                                            motivation = "🎉 Great start! First day completed!"
-                                        elif new_streak < 7:
-                                            motivation = f"💪 {new_streak} days strong! Keep the momentum!"
-                                        elif new_streak < 14:
-                                            motivation = f"🔥 {new_streak} day streak! You're on fire!"
-                                        elif new_streak < 30:
-                                            motivation = f"⭐ {new_streak} days! Consistency is your superpower!"
-                                        elif new_streak < 60:
-                                            motivation = f"🏆 {new_streak} day streak! Incredible dedication!"
-                                        else:
-                                            motivation = f"👑 {new_streak} days! You're a legend!"
-                                        
                                         confirmation_msg = f"✅ Day {day} Completed!\n\n"
                                         confirmation_msg += f"🔥 Current Streak: {new_streak} days\n\n"
-                                        confirmation_msg += motivation
+                                        confirmation_msg += streak_motivation(new_streak)
                                     else:
                                         confirmation_msg = f"📝 Day {day} marked as Not Done\n\n"
                                         confirmation_msg += "Don't worry! You can try again tomorrow.\n"
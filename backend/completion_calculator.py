@@ -23,6 +23,22 @@ class CompletionCalculator:
         
         return round((completed / total) * 100, 1)
     
+    def calculate_from_counts(self, completed: int, total: int) -> float:
+        """
+        Return completion percentage from pre-aggregated counts
+        
+        Args:
+            completed: Number of DONE days
+            total: Number of days
+            
+        Returns:
+            Completion percentage (0-100)
+        """
+        if not total:
+            return 0.0
+        
+        return round((completed / total) * 100, 1)
+    
     def calculate_weekly(self, logs: List[UserDailyLog]) -> float:
         """
         Return percentage of DONE days in last 7 days
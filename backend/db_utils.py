@@ -0,0 +1,18 @@
+"""Shared SQLite connection helpers"""
+
+import sqlite3
+
+# Memory-map up to 256MB of the database file and keep a 128MB page cache
+# (negative cache_size is in KiB) so repeated scheduler reads come from memory
+MMAP_SIZE = 268435456
+CACHE_SIZE_KB = 131072
+
+
+def open_db(path) -> sqlite3.Connection:
+    """Open a SQLite connection tuned for repeated reads"""
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
@@ -12,10 +12,13 @@ Handles file uploads, storage, retrieval, and deletion with:
 import uuid
 import os
 import shutil
+import hashlib
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Tuple, BinaryIO
 import sqlite3
+from db_utils import open_db
 
 
 class FileManager:
@@ -23,6 +26,7 @@ class FileManager:
     
     UPLOAD_DIR = Path("uploads/files")
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    COPY_CHUNK_SIZE = 1024 * 1024  # 1MB
     
     ALLOWED_TYPES = {
         'pdf': 'application/pdf',
@@ -39,6 +43,10 @@ class FileManager:
     def __init__(self, db_path: str = "officer_priya.db"):
         """Initialize FileManager with database connection"""
         self.db_path = db_path
+        # Per-thread copy buffer, reused across uploads
+        self._scratch = threading.local()
+        # (year, month) storage directories already created by this instance
+        self._created_dirs: set[tuple[str, str]] = set()
         self._ensure_upload_directory()
     
     def _ensure_upload_directory(self):
@@ -47,7 +55,7 @@ class FileManager:
     
     def _get_connection(self) -> sqlite3.Connection:
         """Get database connection"""
-        conn = sqlite3.Connection(self.db_path)
+        conn = open_db(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -162,12 +170,15 @@ class FileManager:
         """
         file_id = str(uuid.uuid4())
         now = datetime.now()
-        year = now.strftime('%Y')
-        month = now.strftime('%m')
+        year = f"{now.year:04d}"
+        month = f"{now.month:02d}"
         
-        # Create directory structure
+        # Create directory structure (once per month per instance)
         dir_path = self.UPLOAD_DIR / year / month
-        dir_path.mkdir(parents=True, exist_ok=True)
+        key = (year, month)
+        if key not in self._created_dirs:
+            dir_path.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(key)
         
         # Full file path
         filename = f"{file_id}.{extension}"
@@ -178,12 +189,60 @@ class FileManager:
         
         return file_id, full_path, relative_path
     
+    def _find_by_content_hash(self, content_hash: str, extension: str) -> Optional[dict]:
+        """
+        Find a stored file with identical content and the same extension
+        
+        Returns:
+            Dictionary with file metadata or None if no match
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT id, file_id, original_name, file_type, mime_type, file_size, storage_path, created_at
+                FROM files
+                WHERE content_hash = ? AND file_type = ?
+                LIMIT 1
+            """, (content_hash, extension))
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+        
+        if not row or not (self.UPLOAD_DIR / row['storage_path']).exists():
+            return None
+        
+        return dict(row)
+    
+    def _copy_stream(self, src: BinaryIO, dst: BinaryIO, hasher) -> None:
+        """Copy src to dst through the thread's scratch buffer, updating hasher"""
+        if not hasattr(src, 'readinto'):
+            while True:
+                chunk = src.read(self.COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                hasher.update(chunk)
+            return
+        
+        buf = getattr(self._scratch, 'buf', None)
+        if buf is None:
+            buf = self._scratch.buf = bytearray(self.COPY_CHUNK_SIZE)
+        mv = memoryview(buf)
+        while True:
+            n = src.readinto(mv)
+            if not n:
+                break
+            dst.write(mv[:n])
+            hasher.update(mv[:n])
+    
     def save_file(self, file_data: BinaryIO, original_filename: str, uploaded_by: Optional[str] = None) -> dict:
         """
         Save uploaded file to storage
         
         Args:
-            file_data: File binary data
+            file_data: Readable binary stream, copied in chunks
             original_filename: Original filename from upload
             uploaded_by: Optional user identifier
         
@@ -199,13 +258,15 @@ class FileManager:
         if not is_valid:
             raise ValueError(error)
         
-        # Save to temporary location first
+        # Save to temporary location first, hashing the content as it is written
         temp_path = self.UPLOAD_DIR / f"temp_{uuid.uuid4()}"
         try:
             # Write file data
+            hasher = hashlib.sha256()
             with open(temp_path, 'wb') as f:
                 file_data.seek(0)
-                shutil.copyfileobj(file_data, f)
+                self._copy_stream(file_data, f, hasher)
+            content_hash = hasher.hexdigest()
             
             # Get file size
             file_size = temp_path.stat().st_size
@@ -216,6 +277,12 @@ class FileManager:
                 temp_path.unlink()
                 raise ValueError(error)
             
+            # Identical bytes were already validated and stored - reuse that record
+            existing = self._find_by_content_hash(content_hash, extension)
+            if existing:
+                temp_path.unlink()
+                return existing
+            
             # Validate MIME type
             is_valid, mime_type, error = self._validate_mime_type(temp_path, extension)
             if not is_valid:
@@ -233,9 +300,9 @@ class FileManager:
             cursor = conn.cursor()
             
             cursor.execute("""
-                INSERT INTO files (file_id, original_name, file_type, mime_type, file_size, storage_path, uploaded_by)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (file_id, original_filename, extension, mime_type, file_size, relative_path, uploaded_by))
+                INSERT INTO files (file_id, original_name, file_type, mime_type, file_size, storage_path, uploaded_by, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (file_id, original_filename, extension, mime_type, file_size, relative_path, uploaded_by, content_hash))
             
             file_db_id = cursor.lastrowid
             conn.commit()
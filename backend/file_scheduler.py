@@ -5,6 +5,7 @@ Checks for scheduled files and sends them at the scheduled time
 """
 
 import asyncio
+import logging
 import sqlite3
 from datetime import datetime
 from pathlib import Path
@@ -13,176 +14,218 @@ from file_manager import FileManager
 from user_repository import UserRepository
 from multi_user_database import MultiUserDatabase
 from logger import app_logger
+from db_utils import open_db
 import os
 from dotenv import load_dotenv
 import pytz
 
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
 load_dotenv()
 
 # Set timezone to Indian Standard Time
 IST = pytz.timezone('Asia/Kolkata')
 
 class FileScheduler:
-    def __init__(self):
+    # Concurrent sends per scheduled file (matches the bot's connection pool)
+    SEND_WORKERS = 8
+    USER_BATCH_SIZE = 500
+    
+    def __init__(self, bot: TelegramBot = None):
         self.db_path = "officer_priya_multi.db"
         self.file_manager = FileManager(db_path=self.db_path)
         self.db = MultiUserDatabase()
         self.user_repo = UserRepository(self.db)
         
-        bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-        self.bot = TelegramBot(bot_token)
-        
-    def get_pending_schedules(self):
-        """Get all pending scheduled files that are due"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Get current time in IST
-        now = datetime.now(IST).strftime("%Y-%m-%d %H:%M")
-        
-        # First, get ALL scheduled files for debugging
-        cursor.execute("SELECT * FROM scheduled_files ORDER BY scheduled_time ASC")
-        all_schedules = [dict(row) for row in cursor.fetchall()]
-        
-        if all_schedules:
-            print(f"\n📋 ALL SCHEDULED FILES (Current IST time: {now}):")
-            for s in all_schedules:
-                print(f"   ID: {s['id']}, Time: {s['scheduled_time']}, Status: {s['status']}")
+        # Reuse the app's bot (and its connection pool) when given one
+        self.bot = bot or TelegramBot(os.getenv("TELEGRAM_BOT_TOKEN"))
         
-        # Now get pending schedules
-        cursor.execute("""
-            SELECT * FROM scheduled_files
-            WHERE status = 'pending'
-            AND scheduled_time <= ?
-            ORDER BY scheduled_time ASC
-        """, (now,))
+    def claim_pending_schedules(self):
+        """
+        Get all pending scheduled files that are due and mark them 'sending'
         
-        schedules = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        Claimed rows are no longer pending, so a crash or restart part way
+        through a broadcast can't send the same file to everyone again.
+        """
+        conn = open_db(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.cursor()
+            
+            # Get current time in IST
+            now = datetime.now(IST).strftime("%Y-%m-%d %H:%M")
+            
+            if app_logger.isEnabledFor(logging.DEBUG):
+                cursor.execute("SELECT id, scheduled_time, status FROM scheduled_files ORDER BY scheduled_time ASC")
+                for row in cursor.fetchall():
+                    app_logger.debug("Schedule %s at %s: %s (now %s IST)", row['id'], row['scheduled_time'], row['status'], now)
+            
+            # Select and claim in one write transaction
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                SELECT * FROM scheduled_files
+                WHERE status = 'pending'
+                AND scheduled_time <= ?
+                ORDER BY scheduled_time ASC
+            """, (now,))
+            schedules = [dict(row) for row in cursor.fetchall()]
+            
+            cursor.executemany("""
+                UPDATE scheduled_files
+                SET status = 'sending'
+                WHERE id = ?
+            """, [(schedule['id'],) for schedule in schedules])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
         
         return schedules
     
-    def mark_as_sent(self, schedule_id: int):
-        """Mark a schedule as sent"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE scheduled_files
-            SET status = 'sent'
-            WHERE id = ?
-        """, (schedule_id,))
+    def mark_statuses(self, results):
+        """Apply (schedule_id, status, error) results in a single transaction"""
+        if not results:
+            return
         
-        conn.commit()
-        conn.close()
+        conn = open_db(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                UPDATE scheduled_files
+                SET status = ?
+                WHERE id = ?
+            """, [(status, schedule_id) for schedule_id, status, _ in results])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
     
-    def mark_as_failed(self, schedule_id: int, error: str):
-        """Mark a schedule as failed"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE scheduled_files
-            SET status = 'failed'
-            WHERE id = ?
-        """, (schedule_id,))
-        
-        conn.commit()
-        conn.close()
+    async def _read_file(self, file_path: Path) -> bytes:
+        """Read a file without blocking the event loop"""
+        if aiofiles is not None:
+            async with aiofiles.open(file_path, 'rb') as fh:
+                return await fh.read()
+        return await asyncio.to_thread(file_path.read_bytes)
     
     async def send_scheduled_file(self, schedule):
-        """Send a scheduled file to all users"""
+        """
+        Send a scheduled file to all users
+        
+        Returns:
+            (schedule_id, 'sent' | 'failed', error) for the caller to persist
+        """
+        file_id = schedule['file_id']
+        schedule_id = schedule['id']
         try:
-            file_id = schedule['file_id']
-            schedule_id = schedule['id']
-            
-            print(f"\n{'='*60}")
-            print(f"📅 SENDING SCHEDULED FILE")
-            print(f"   Schedule ID: {schedule_id}")
-            print(f"   File ID: {file_id}")
-            print(f"   Scheduled Time: {schedule['scheduled_time']}")
-            print(f"{'='*60}")
+            app_logger.debug("Sending scheduled file %s (schedule %s, due %s)", file_id, schedule_id, schedule['scheduled_time'])
             
             # Get file metadata
-            metadata = self.file_manager.get_file_metadata(file_id)
+            metadata = await asyncio.to_thread(self.file_manager.get_file_metadata, file_id)
             if not metadata:
-                print(f"❌ File not found: {file_id}")
-                self.mark_as_failed(schedule_id, "File not found")
-                return
+                app_logger.warning("Scheduled file not found: %s", file_id)
+                return schedule_id, 'failed', "File not found"
             
-            print(f"✅ File: {metadata['original_name']} ({metadata['file_size']} bytes)")
+            app_logger.debug("File: %s (%s bytes)", metadata['original_name'], metadata['file_size'])
             
             # Get file path
-            file_path = self.file_manager.get_file_path(file_id)
+            file_path = await asyncio.to_thread(self.file_manager.get_file_path, file_id)
             if not file_path or not file_path.exists():
-                print(f"❌ File not found on disk: {file_path}")
-                self.mark_as_failed(schedule_id, "File not found on disk")
-                return
-            
-            # Get all users
-            users = self.user_repo.get_all_users()
-            if not users:
-                print(f"❌ No users found")
-                self.mark_as_failed(schedule_id, "No users found")
-                return
+                app_logger.warning("Scheduled file not found on disk: %s", file_path)
+                return schedule_id, 'failed', "File not found on disk"
             
-            print(f"📊 Sending to {len(users)} users...")
+            # Read the file once and reuse the bytes for every user
+            file_bytes = await self._read_file(file_path)
             
             file_type = metadata['file_type']
             caption = f"📄 {metadata['original_name']}\n⏰ Scheduled delivery"
             
-            # Send to all users
+            queue = asyncio.Queue(maxsize=self.USER_BATCH_SIZE)
             success_count = 0
-            for user in users:
-                try:
-                    print(f"  → Sending to {user.first_name} ({user.chat_id})...")
-                    success, error = await self.bot.send_file_with_retry(
-                        user.chat_id,
-                        str(file_path),
-                        caption,
-                        file_type,
-                        max_retries=2
-                    )
-                    
-                    if success:
-                        print(f"  ✅ Sent to {user.first_name}")
-                        success_count += 1
-                    else:
-                        print(f"  ❌ Failed to send to {user.first_name}: {error}")
-                except Exception as e:
-                    print(f"  ❌ Exception sending to {user.first_name}: {e}")
-            
-            print(f"\n📊 SEND COMPLETE: {success_count}/{len(users)} users")
-            print(f"{'='*60}\n")
-            
-            # Mark as sent
-            self.mark_as_sent(schedule_id)
-            app_logger.info(f"Scheduled file {file_id} sent to {success_count}/{len(users)} users")
+            # The first send uploads the file; the other workers wait for it
+            # so they can re-send by Telegram file_id instead of uploading
+            first_sent = asyncio.Event()
+            
+            async def worker(primary):
+                nonlocal success_count
+                if not primary:
+                    await first_sent.wait()
+                while True:
+                    user = await queue.get()
+                    if user is None:
+                        first_sent.set()
+                        return
+                    try:
+                        app_logger.debug("Sending to %s (%s)", user.first_name, user.chat_id)
+                        success, error = await self.bot.send_file_with_retry(
+                            user.chat_id,
+                            str(file_path),
+                            caption,
+                            file_type,
+                            max_retries=2,
+                            file_bytes=file_bytes,
+                            filename=metadata['original_name']
+                        )
+                        
+                        if success:
+                            app_logger.debug("Sent to %s", user.first_name)
+                            success_count += 1
+                        else:
+                            app_logger.debug("Failed to send to %s: %s", user.first_name, error)
+                    except Exception as e:
+                        app_logger.debug("Exception sending to %s: %s", user.first_name, e)
+                    finally:
+                        first_sent.set()
+            
+            workers = [asyncio.create_task(worker(i == 0)) for i in range(self.SEND_WORKERS)]
+            
+            # Stream users page by page so sends start before all users are loaded
+            total = 0
+            try:
+                pages = self.user_repo.get_all_users_iter(chunk=self.USER_BATCH_SIZE)
+                while True:
+                    batch = await asyncio.to_thread(next, pages, None)
+                    if batch is None:
+                        break
+                    total += len(batch)
+                    for user in batch:
+                        await queue.put(user)
+            finally:
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            
+            if total == 0:
+                app_logger.warning("No users found for scheduled file")
+                return schedule_id, 'failed', "No users found"
+            
+            app_logger.info("Sent %d/%d for %s", success_count, total, file_id)
+            return schedule_id, 'sent', None
             
         except Exception as e:
-            print(f"❌ Error sending scheduled file: {e}")
-            app_logger.error(f"Error sending scheduled file: {e}", exc_info=True)
-            self.mark_as_failed(schedule_id, str(e))
+            app_logger.error("Error sending scheduled file: %s", e, exc_info=True)
+            return schedule_id, 'failed', str(e)
     
     async def check_and_send(self):
         """Check for pending schedules and send them"""
-        schedules = self.get_pending_schedules()
+        schedules = self.claim_pending_schedules()
         
         if schedules:
-            print(f"\n📅 Found {len(schedules)} scheduled file(s) to send")
-            for schedule in schedules:
-                await self.send_scheduled_file(schedule)
-        else:
-            # Show timestamp every 10 checks (10 minutes)
-            if not hasattr(self, '_check_count'):
-                self._check_count = 0
-            self._check_count += 1
-            if self._check_count % 10 == 0:
-                now = datetime.now(IST).strftime("%Y-%m-%d %H:%M:%S")
-                print(f"\n⏰ [{now} IST] No pending schedules")
-            else:
-                print(".", end="", flush=True)
+            app_logger.debug("Found %d scheduled file(s) to send", len(schedules))
+            results = []
+            try:
+                for schedule in schedules:
+                    results.append(await self.send_scheduled_file(schedule))
+            finally:
+                # One commit for the whole batch of status updates, including
+                # the sends that finished before a cancellation or error
+                self.mark_statuses(results)
     
     async def run(self):
         """Main scheduler loop"""
@@ -204,8 +247,7 @@ class FileScheduler:
                 print("\n\n🛑 Scheduler stopped by user")
                 break
             except Exception as e:
-                print(f"\n❌ Scheduler error: {e}")
-                app_logger.error(f"Scheduler error: {e}", exc_info=True)
+                app_logger.error("Scheduler error: %s", e, exc_info=True)
                 await asyncio.sleep(60)
 
 
@@ -215,4 +257,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Use uvloop when available (installed with uvicorn[standard])
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 """Fix schedule time in database - set to 06:00"""
 
-import sqlite3
+from db_utils import open_db
 
 def fix_schedule_time():
     db_path = "officer_priya_multi.db"
-    conn = sqlite3.connect(db_path)
+    conn = open_db(db_path)
     cursor = conn.cursor()
     
     # Check current value
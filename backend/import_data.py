@@ -7,6 +7,46 @@ Run this on Render to restore data after restart
 import sqlite3
 import sys
 from pathlib import Path
+from db_utils import open_db
+
+def iter_statements(fp):
+    """Yield SQL statements from a dump one at a time, splitting on ';' outside string literals"""
+    buf = []
+    in_string = False
+    for line in fp:
+        # Skip comment lines
+        if not in_string and line.lstrip().startswith('--'):
+            continue
+        
+        start = pos = 0
+        while True:
+            quote = line.find("'", pos)
+            if in_string:
+                # '' escapes close and reopen the string, so they need no special case
+                if quote == -1:
+                    break
+                in_string = False
+                pos = quote + 1
+                continue
+            
+            semi = line.find(';', pos)
+            if semi != -1 and (quote == -1 or semi < quote):
+                buf.append(line[start:semi])
+                statement = ''.join(buf).strip()
+                if statement:
+                    yield statement
+                buf = []
+                start = pos = semi + 1
+            elif quote != -1:
+                in_string = True
+                pos = quote + 1
+            else:
+                break
+        buf.append(line[start:])
+    
+    statement = ''.join(buf).strip()
+    if statement:
+        yield statement
 
 def import_data():
     """Import SQL data into database"""
@@ -25,43 +65,25 @@ def import_data():
     print(f"{'='*60}\n")
     
     try:
-        # Read SQL file
-        with open(sql_file, 'r') as f:
-            sql_content = f.read()
-        
         # Connect to database
-        conn = sqlite3.connect(str(db_path))
+        conn = open_db(db_path)
         cursor = conn.cursor()
         
-        # Split by semicolons and execute each statement
-        # Remove comments and empty lines
-        lines = []
-        for line in sql_content.split('\n'):
-            line = line.strip()
-            if line and not line.startswith('--'):
-                lines.append(line)
-        
-        sql_content = ' '.join(lines)
-        statements = [s.strip() for s in sql_content.split(';') if s.strip()]
-        
+        # Stream statements from the dump one at a time
         success_count = 0
-        for statement in statements:
-            try:
-                cursor.execute(statement)
-                success_count += 1
-                # Extract table name for logging
-                if 'INSERT INTO' in statement:
-                    table_name = statement.split('INSERT INTO')[1].split('(')[0].strip()
-                    if 'DO UPDATE' in statement:
-                        print(f"✅ Updated {table_name}")
-                    else:
-                        print(f"✅ Imported into {table_name}")
-            except sqlite3.IntegrityError as e:
-                # Skip conflicts (data already exists)
-                print(f"⚠️  Skipped duplicate: {e}")
-            except Exception as e:
-                print(f"❌ Error executing statement: {e}")
-                print(f"   Statement: {statement[:150]}...")
+        with open(sql_file, 'r') as f:
+            for i, statement in enumerate(iter_statements(f), 1):
+                if i % 1000 == 0:
+                    print(f"  …{i} statements")
+                try:
+                    cursor.execute(statement)
+                    success_count += 1
+                except sqlite3.IntegrityError as e:
+                    # Skip conflicts (data already exists)
+                    print(f"⚠️  Skipped duplicate: {e}")
+                except Exception as e:
+                    print(f"❌ Error executing statement: {e}")
+                    print(f"   Statement: {statement[:150]}...")
         
         conn.commit()
         conn.close()
@@ -72,7 +94,7 @@ def import_data():
         print(f"{'='*60}\n")
         
         # Verify data
-        conn = sqlite3.connect(str(db_path))
+        conn = open_db(db_path)
         cursor = conn.cursor()
         
         cursor.execute("SELECT COUNT(*) FROM users")
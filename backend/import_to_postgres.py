@@ -3,18 +3,28 @@
 Import data from database_export.sql into PostgreSQL database
 """
 
+import csv
+import io
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from import_data import iter_statements
+
 try:
     import psycopg2
     from psycopg2 import sql
+    from psycopg2.extras import execute_values
+    from psycopg2.pool import ThreadedConnectionPool
 except ImportError:
     print("❌ psycopg2 not installed. Installing...")
     import subprocess
     subprocess.check_call([sys.executable, "-m", "pip", "install", "psycopg2-binary"])
     import psycopg2
     from psycopg2 import sql
+    from psycopg2.extras import execute_values
+    from psycopg2.pool import ThreadedConnectionPool
 
 # PostgreSQL connection string
 # Get from environment variable or use default
@@ -58,6 +68,7 @@ def create_tables(cursor):
             gk_rotation_index INTEGER DEFAULT 0,
             day_count INTEGER DEFAULT 0,
             streak INTEGER DEFAULT 0,
+            last_done_day INTEGER,
             schedule_enabled BOOLEAN DEFAULT FALSE,
             schedule_time VARCHAR(10) DEFAULT '06:00',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -129,6 +140,174 @@ def create_tables(cursor):
         cursor.execute(table_sql)
         table_name = table_sql.split("TABLE IF NOT EXISTS")[1].split("(")[0].strip()
         print(f"  ✅ {table_name}")
+    
+    # Backs the "already sent today" check (log_exists_for_date); the
+    # UNIQUE(user_id, day_number) constraint already covers day lookups
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_logs_user_date ON user_daily_logs(user_id, date)")
+    print("  ✅ idx_user_logs_user_date")
+
+INSERT_PREFIX = re.compile(r"INSERT INTO (\w+) \(([^)]*)\) VALUES \(", re.IGNORECASE)
+
+def _parse_values(statement, pos):
+    """Parse a VALUES (...) literal list starting after '(' - returns (values, end position)"""
+    values = []
+    length = len(statement)
+    while pos < length:
+        while statement[pos].isspace():
+            pos += 1
+        
+        if statement[pos] == "'":
+            # Quoted string with '' escapes
+            chunks = []
+            pos += 1
+            while True:
+                end = statement.index("'", pos)
+                chunks.append(statement[pos:end])
+                if statement.startswith("''", end):
+                    chunks.append("'")
+                    pos = end + 2
+                else:
+                    pos = end + 1
+                    break
+            values.append(''.join(chunks))
+        else:
+            end = pos
+            while statement[end] not in ',)':
+                end += 1
+            token = statement[pos:end].strip()
+            upper = token.upper()
+            if upper == 'NULL':
+                values.append(None)
+            elif upper in ('TRUE', 'FALSE'):
+                values.append(upper == 'TRUE')
+            else:
+                try:
+                    values.append(int(token))
+                except ValueError:
+                    values.append(float(token))
+            pos = end
+        
+        while statement[pos].isspace():
+            pos += 1
+        if statement[pos] == ')':
+            return values, pos + 1
+        pos += 1  # skip ','
+    
+    raise ValueError("Unterminated VALUES list")
+
+def parse_insert(statement):
+    """Split an exported INSERT into (table, columns, values, conflict clause), or None"""
+    match = INSERT_PREFIX.match(statement)
+    if not match:
+        return None
+    
+    try:
+        values, end = _parse_values(statement, match.end())
+    except (ValueError, IndexError):
+        return None
+    
+    columns = [c.strip() for c in match.group(2).split(',')]
+    if len(columns) != len(values):
+        return None
+    
+    return match.group(1), columns, values, statement[end:].strip()
+
+def copy_rows(cursor, table, columns, rows):
+    """Bulk load rows with COPY, skipping rows that already exist - returns rows inserted"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(['\\N' if value is None else value for value in row])
+    buf.seek(0)
+    
+    cols = ', '.join(columns)
+    temp_table = f"import_{table}"
+    
+    # COPY has no ON CONFLICT, so stage into a temp table and merge from there
+    cursor.execute(f"CREATE TEMP TABLE {temp_table} (LIKE {table} INCLUDING DEFAULTS)")
+    cursor.copy_expert(f"COPY {temp_table} ({cols}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')", buf)
+    cursor.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {temp_table} ON CONFLICT DO NOTHING")
+    inserted = cursor.rowcount
+    cursor.execute(f"DROP TABLE {temp_table}")
+    return inserted
+
+# Tables that must be loaded before the keyed table (foreign keys)
+TABLE_DEPENDENCIES = {
+    'user_config': {'users'},
+    'user_daily_logs': {'users'},
+}
+
+# Parallel COPY connections
+COPY_WORKERS = 4
+
+def dependency_layers(tables):
+    """Group tables into layers so every table comes after the tables it references"""
+    pending = set(tables)
+    layers = []
+    while pending:
+        layer = {t for t in pending if not (TABLE_DEPENDENCIES.get(t, set()) & pending)}
+        if not layer:
+            # Cycle - load the rest together
+            layer = pending
+        layers.append(sorted(layer))
+        pending -= layer
+    return layers
+
+def _copy_table(pool, table, columns, rows):
+    """COPY one group on its own pooled connection and commit it"""
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cursor:
+            inserted = copy_rows(cursor, table, columns, rows)
+        conn.commit()
+        return inserted
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+def copy_groups_parallel(copy_groups):
+    """
+    Load COPY groups over several connections, one dependency layer at a time
+    
+    Returns (rows loaded, statements of failed groups to retry one by one)
+    """
+    loaded = 0
+    failed = []
+    pool = ThreadedConnectionPool(1, COPY_WORKERS, DATABASE_URL)
+    try:
+        with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+            for layer in dependency_layers({table for table, _ in copy_groups}):
+                futures = {
+                    executor.submit(_copy_table, pool, table, columns, [values for values, _ in rows]): (table, rows)
+                    for (table, columns), rows in copy_groups.items()
+                    if table in layer
+                }
+                for future, (table, rows) in futures.items():
+                    try:
+                        inserted = future.result()
+                        loaded += len(rows)
+                        print(f"  ✅ Copied {len(rows)} rows into {table} ({inserted} new)")
+                    except Exception as e:
+                        # One bad row fails the whole COPY - retry individually
+                        print(f"  ⚠️  COPY into {table} failed ({e}), retrying row by row")
+                        failed.extend(statement for _, statement in rows)
+    finally:
+        pool.closeall()
+    return loaded, failed
+
+def upsert_rows(cursor, table, columns, conflict, rows):
+    """Insert rows sharing one ON CONFLICT clause as multi-VALUES statements"""
+    cols = ', '.join(columns)
+    template = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    execute_values(
+        cursor,
+        f"INSERT INTO {table} ({cols}) VALUES %s {conflict}",
+        rows,
+        template=template,
+        page_size=500
+    )
 
 def import_data():
     """Import SQL data into PostgreSQL database"""
@@ -156,81 +335,93 @@ def import_data():
         create_tables(cursor)
         conn.commit()
         
-        # Read SQL file
+        # Plain inserts are bulk loaded with COPY, upserts are batched per
+        # conflict clause, and anything unparsed runs as-is
+        copy_groups = {}
+        upsert_groups = {}
+        remaining = []
+        statement_count = 0
         print("\n📥 Reading SQL file...")
         with open(sql_file, 'r') as f:
-            sql_content = f.read()
+            for statement in iter_statements(f):
+                statement_count += 1
+                parsed = parse_insert(statement)
+                if not parsed:
+                    remaining.append(statement)
+                    continue
+                table_name, columns, values, conflict = parsed
+                if conflict.upper() == 'ON CONFLICT DO NOTHING':
+                    copy_groups.setdefault((table_name, tuple(columns)), []).append((values, statement))
+                else:
+                    upsert_groups.setdefault((table_name, tuple(columns), conflict), []).append((values, statement))
         
-        # Convert SQLite SQL to PostgreSQL SQL
-        # Replace ON CONFLICT DO NOTHING with PostgreSQL syntax
-        sql_content = sql_content.replace('ON CONFLICT DO NOTHING', 'ON CONFLICT DO NOTHING')
-        sql_content = sql_content.replace('ON CONFLICT(user_id)', 'ON CONFLICT (user_id)')
-        sql_content = sql_content.replace('ON CONFLICT(id)', 'ON CONFLICT (id)')
+        print(f"📊 Found {statement_count} statements to execute\n")
         
-        # Remove comments and split statements
-        lines = []
-        for line in sql_content.split('\n'):
-            line = line.strip()
-            if line and not line.startswith('--'):
-                lines.append(line)
+        # COPY groups load in parallel, each table committed on its own
+        # connection; the rest runs in one transaction where a savepoint per
+        # batch keeps one bad batch from aborting the import
+        success_count, failed_copies = copy_groups_parallel(copy_groups)
+        remaining.extend(failed_copies)
         
-        sql_content = ' '.join(lines)
-        statements = [s.strip() for s in sql_content.split(';') if s.strip()]
-        
-        print(f"📊 Found {len(statements)} statements to execute\n")
+        for (table_name, columns, conflict), rows in upsert_groups.items():
+            cursor.execute("SAVEPOINT import_batch")
+            try:
+                upsert_rows(cursor, table_name, columns, conflict, [values for values, _ in rows])
+                cursor.execute("RELEASE SAVEPOINT import_batch")
+                success_count += len(rows)
+                print(f"  ✅ Upserted {len(rows)} rows into {table_name}")
+            except Exception as e:
+                # e.g. two rows hitting the same key in one statement - retry individually
+                cursor.execute("ROLLBACK TO SAVEPOINT import_batch")
+                print(f"  ⚠️  Batch upsert into {table_name} failed ({e}), retrying row by row")
+                remaining.extend(statement for _, statement in rows)
         
-        success_count = 0
-        for i, statement in enumerate(statements, 1):
+        for i, statement in enumerate(remaining, 1):
+            if i % 1000 == 0:
+                print(f"  …{i}/{len(remaining)} remaining statements")
+            cursor.execute("SAVEPOINT import_batch")
             try:
                 cursor.execute(statement)
+                cursor.execute("RELEASE SAVEPOINT import_batch")
                 success_count += 1
-                # Extract table name for logging
-                if 'INSERT INTO' in statement:
-                    table_name = statement.split('INSERT INTO')[1].split('(')[0].strip()
-                    if 'DO UPDATE' in statement:
-                        print(f"  {i}. ✅ Updated {table_name}")
-                    else:
-                        print(f"  {i}. ✅ Inserted into {table_name}")
             except psycopg2.IntegrityError as e:
                 print(f"  {i}. ⚠️  Skipped duplicate: {e}")
-                conn.rollback()
+                cursor.execute("ROLLBACK TO SAVEPOINT import_batch")
             except Exception as e:
                 print(f"  {i}. ❌ Error: {e}")
                 print(f"     Statement: {statement[:150]}...")
-                conn.rollback()
+                cursor.execute("ROLLBACK TO SAVEPOINT import_batch")
         
         conn.commit()
         
         print(f"\n{'='*60}")
         print(f"✅ IMPORT COMPLETE")
-        print(f"   Executed {success_count}/{len(statements)} statements")
+        print(f"   Executed {success_count}/{statement_count} statements")
         print(f"{'='*60}\n")
         
         # Verify data
         print(f"📊 DATABASE CONTENTS:")
         
-        cursor.execute("SELECT COUNT(*) FROM users")
-        user_count = cursor.fetchone()[0]
+        # All counts in one round-trip
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM users),
+                (SELECT COUNT(*) FROM user_config),
+                (SELECT COUNT(*) FROM user_daily_logs),
+                (SELECT COUNT(*) FROM global_playlist_schedules),
+                (SELECT COUNT(*) FROM custom_subjects)
+        """)
+        user_count, config_count, log_count, schedule_count, custom_count = cursor.fetchone()
         print(f"   Users: {user_count}")
-        
-        cursor.execute("SELECT COUNT(*) FROM user_config")
-        config_count = cursor.fetchone()[0]
         print(f"   Configs: {config_count}")
-        
-        cursor.execute("SELECT COUNT(*) FROM user_daily_logs")
-        log_count = cursor.fetchone()[0]
         print(f"   Daily logs: {log_count}")
-        
-        cursor.execute("SELECT COUNT(*) FROM global_playlist_schedules")
-        schedule_count = cursor.fetchone()[0]
         print(f"   Schedules: {schedule_count}")
-        
-        cursor.execute("SELECT COUNT(*) FROM custom_subjects")
-        custom_count = cursor.fetchone()[0]
         print(f"   Custom subjects: {custom_count}")
         
-        # Show user details
-        cursor.execute("""
+        # Show user details, streamed through a server-side cursor
+        user_cursor = conn.cursor(name='user_iter')
+        user_cursor.itersize = 100
+        user_cursor.execute("""
             SELECT u.first_name, u.chat_id, c.day_count, c.streak, c.english_index, c.history_index
             FROM users u
             JOIN user_config c ON u.id = c.user_id
@@ -238,9 +429,10 @@ def import_data():
         """)
         
         print(f"\n👥 USER STATUS:")
-        for row in cursor.fetchall():
+        for row in user_cursor:
             name, chat_id, day, streak, eng_idx, hist_idx = row
             print(f"   {name} ({chat_id}): Day {day}, Streak 🔥 {streak}, English #{eng_idx}, History #{hist_idx}")
+        user_cursor.close()
         
         # Show global config
         cursor.execute("SELECT current_day, english_index, history_index FROM global_config WHERE id=1")
@@ -5,20 +5,23 @@ Provides validation functions for user inputs
 """
 
 import re
+import string
+from functools import lru_cache
 from typing import Optional, Tuple
-from urllib.parse import urlparse
 
 
 class InputValidator:
     """Input validation utilities"""
     
-    # Regex patterns
-    EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-    USERNAME_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{3,32}$')
-    YOUTUBE_URL_PATTERN = re.compile(
-        r'^(https?://)?(www\.)?(youtube\.com|youtu\.be)/(watch\?v=|playlist\?list=|embed/)?[\w-]+(&[\w=]*)*$'
-    )
-    TELEGRAM_CHAT_ID_PATTERN = re.compile(r'^-?\d{6,15}$')
+    # Regex patterns (inputs are ASCII-only; used with fullmatch, so no anchors)
+    EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', re.ASCII)
+    USERNAME_PATTERN = re.compile(r'[a-zA-Z0-9_-]{3,32}', re.ASCII)
+    
+    # YouTube URL parts, checked with plain string operations
+    YOUTUBE_HOSTS = frozenset({'youtube.com', 'www.youtube.com', 'youtu.be', 'www.youtu.be'})
+    YOUTUBE_PATH_PREFIXES = ('watch?v=', 'playlist?list=', 'embed/')
+    YOUTUBE_ID_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
+    YOUTUBE_PARAM_CHARS = YOUTUBE_ID_CHARS | {'='}
     
     @staticmethod
     def validate_email(email: str) -> Tuple[bool, Optional[str]]:
@@ -29,7 +32,7 @@ class InputValidator:
         if len(email) > 255:
             return False, "Email is too long"
         
-        if not InputValidator.EMAIL_PATTERN.match(email):
+        if not InputValidator.EMAIL_PATTERN.fullmatch(email):
             return False, "Invalid email format"
         
         return True, None
@@ -40,13 +43,14 @@ class InputValidator:
         if not username:
             return False, "Username is required"
         
-        if len(username) < 3:
+        length = len(username)
+        if length < 3:
             return False, "Username must be at least 3 characters"
         
-        if len(username) > 32:
+        if length > 32:
             return False, "Username must be at most 32 characters"
         
-        if not InputValidator.USERNAME_PATTERN.match(username):
+        if not InputValidator.USERNAME_PATTERN.fullmatch(username):
             return False, "Username can only contain letters, numbers, hyphens, and underscores"
         
         return True, None
@@ -57,15 +61,22 @@ class InputValidator:
         if not password:
             return False, "Password is required"
         
-        if len(password) < 8:
+        length = len(password)
+        if length < 8:
             return False, "Password must be at least 8 characters"
         
-        if len(password) > 128:
+        if length > 128:
             return False, "Password is too long"
         
-        # Check for at least one letter and one number
-        has_letter = any(c.isalpha() for c in password)
-        has_number = any(c.isdigit() for c in password)
+        # Check for at least one letter and one number in a single pass
+        has_letter = has_number = False
+        for c in password:
+            if not has_letter and c.isalpha():
+                has_letter = True
+            elif not has_number and c.isdigit():
+                has_number = True
+            if has_letter and has_number:
+                break
         
         if not (has_letter and has_number):
             return False, "Password must contain at least one letter and one number"
@@ -75,27 +86,34 @@ class InputValidator:
     @staticmethod
     def validate_youtube_url(url: str) -> Tuple[bool, Optional[str]]:
         """Validate YouTube URL"""
-        if not url:
-            return False, "URL is required"
-        
-        if len(url) > 2048:
-            return False, "URL is too long"
-        
-        if not InputValidator.YOUTUBE_URL_PATTERN.match(url):
-            return False, "Invalid YouTube URL format"
-        
-        return True, None
+        return _validate_youtube_url(url)
+    
+    @staticmethod
+    def _is_youtube_url(url: str) -> bool:
+        """Check [http(s)://]host/[watch?v=|playlist?list=|embed/]<id>[&param...]"""
+        if url.startswith(('https://', 'http://')):
+            url = url.partition('://')[2]
+        
+        host, sep, path = url.partition('/')
+        if not sep or host not in InputValidator.YOUTUBE_HOSTS:
+            return False
+        
+        for prefix in InputValidator.YOUTUBE_PATH_PREFIXES:
+            if path.startswith(prefix):
+                path = path[len(prefix):]
+                break
+        
+        video_id, *params = path.split('&')
+        if not video_id or not InputValidator.YOUTUBE_ID_CHARS.issuperset(video_id):
+            return False
+        
+        param_chars = InputValidator.YOUTUBE_PARAM_CHARS
+        return all(param_chars.issuperset(param) for param in params)
     
     @staticmethod
     def validate_telegram_chat_id(chat_id: str) -> Tuple[bool, Optional[str]]:
         """Validate Telegram chat ID"""
-        if not chat_id:
-            return False, "Chat ID is required"
-        
-        if not InputValidator.TELEGRAM_CHAT_ID_PATTERN.match(chat_id):
-            return False, "Invalid Telegram chat ID format"
-        
-        return True, None
+        return _validate_telegram_chat_id(chat_id)
     
     @staticmethod
     def sanitize_string(text: str, max_length: int = 1000) -> str:
@@ -124,23 +142,28 @@ class InputValidator:
         if len(url) > 2048:
             return False, "URL is too long"
         
-        try:
-            result = urlparse(url)
-            if not all([result.scheme, result.netloc]):
-                return False, "Invalid URL format"
-            
-            if result.scheme not in ['http', 'https']:
-                return False, "URL must use HTTP or HTTPS"
-            
-            return True, None
-        except Exception:
+        scheme = url[:8].lower()
+        if scheme.startswith('https://'):
+            host_start = 8
+        elif scheme.startswith('http://'):
+            host_start = 7
+        elif '://' in url:
+            return False, "URL must use HTTP or HTTPS"
+        else:
+            return False, "Invalid URL format"
+        
+        # Host must be non-empty
+        if url[host_start:host_start + 1] in ('', '/', '?', '#'):
             return False, "Invalid URL format"
+        
+        return True, None
     
     @staticmethod
     def validate_integer(value: any, min_val: int = None, max_val: int = None) -> Tuple[bool, Optional[str]]:
         """Validate integer value"""
         try:
-            int_value = int(value)
+            # Skip the int() call when the value is already an int (not bool)
+            int_value = value if type(value) is int else int(value)
             
             if min_val is not None and int_value < min_val:
                 return False, f"Value must be at least {min_val}"
@@ -153,5 +176,33 @@ class InputValidator:
             return False, "Invalid integer value"
 
 
+# The same playlist URLs and chat IDs are validated over and over, so the
+# results of these pure checks are cached
+@lru_cache(maxsize=1024)
+def _validate_youtube_url(url: str) -> Tuple[bool, Optional[str]]:
+    if not url:
+        return False, "URL is required"
+    
+    if len(url) > 2048:
+        return False, "URL is too long"
+    
+    if not InputValidator._is_youtube_url(url):
+        return False, "Invalid YouTube URL format"
+    
+    return True, None
+
+
+@lru_cache(maxsize=1024)
+def _validate_telegram_chat_id(chat_id: str) -> Tuple[bool, Optional[str]]:
+    if not chat_id:
+        return False, "Chat ID is required"
+    
+    digits = chat_id[1:] if chat_id.startswith('-') else chat_id
+    if not (6 <= len(digits) <= 15 and digits.isascii() and digits.isdigit()):
+        return False, "Invalid Telegram chat ID format"
+    
+    return True, None
+
+
 # Global instance
 validator = InputValidator()
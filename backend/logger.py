@@ -3,10 +3,15 @@
 
 import logging
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import atexit
 import sqlite3
+from collections import namedtuple
 from typing import Optional
 
 # Create logs directory
@@ -16,20 +21,40 @@ LOGS_DIR.mkdir(exist_ok=True)
 # Database for error tracking
 ERROR_DB = "logs/errors.db"
 
+# One string object for every insert, so sqlite3's statement cache hits each batch
+_INSERT_SQL = (
+    "INSERT INTO error_logs (timestamp, level, module, function, message, exception, stack_trace) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
 
 class DatabaseHandler(logging.Handler):
     """Custom handler to store errors in database"""
     
+    # Writer thread commits up to BATCH_SIZE records or whatever arrived
+    # within FLUSH_INTERVAL seconds in one transaction
+    BATCH_SIZE = 64
+    FLUSH_INTERVAL = 0.2
+    _STOP = object()
+    
     def __init__(self):
         super().__init__()
+        self._conn = None
+        self._lock = threading.Lock()
         self._init_db()
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._drain, name="error-log-writer", daemon=True)
+        self._writer.start()
     
     def _init_db(self):
-        """Initialize error tracking database"""
-        conn = sqlite3.connect(ERROR_DB)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        """Initialize error tracking database and keep the connection open"""
+        # Autocommit connection shared by every emit; WAL + synchronous=NORMAL
+        # avoids a full fsync per logged error
+        self._conn = sqlite3.connect(ERROR_DB, check_same_thread=False, isolation_level=None)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            
             CREATE TABLE IF NOT EXISTS error_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
@@ -40,36 +65,136 @@ class DatabaseHandler(logging.Handler):
                 exception TEXT,
                 stack_trace TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+            );
+            
+            -- get_recent_errors orders by created_at and clear_old_errors ranges over it
+            CREATE INDEX IF NOT EXISTS idx_error_logs_created_at
+            ON error_logs(created_at DESC);
         """)
-        
-        conn.commit()
-        conn.close()
     
     def emit(self, record):
-        """Store log record in database"""
+        """Queue log record for the writer thread"""
         try:
-            conn = sqlite3.connect(ERROR_DB)
-            cursor = conn.cursor()
+            exc = record.exc_info
+            if exc:
+                # Formatter caches the traceback on record.exc_text, so the
+                # file handler's earlier format() already rendered it
+                exc_str = str(exc[1])
+                stack_trace = self.format(record)
+            else:
+                exc_str = stack_trace = None
             
-            cursor.execute("""
-                INSERT INTO error_logs 
-                (timestamp, level, module, function, message, exception, stack_trace)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+            self._queue.put((
                 datetime.fromtimestamp(record.created).isoformat(),
                 record.levelname,
                 record.module,
                 record.funcName,
                 record.getMessage(),
-                str(record.exc_info[1]) if record.exc_info else None,
-                self.format(record) if record.exc_info else None
+                exc_str,
+                stack_trace
             ))
+        except Exception as e:
+            print(f"Failed to log to database: {e}")
+    
+    def _drain(self):
+        """Writer thread: batch queued records into single transactions"""
+        while True:
+            item = self._queue.get()
+            batch = []
+            waiters = []
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
             
-            conn.commit()
-            conn.close()
+            while True:
+                if item is self._STOP:
+                    self._write(batch)
+                    return
+                if isinstance(item, threading.Event):
+                    # flush() request - write what we have now
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.BATCH_SIZE:
+                    break
+                
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            
+            self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+    
+    def _write(self, batch):
+        """Insert a batch of records in one transaction"""
+        if not batch:
+            return
+        try:
+            with self._lock:
+                if self._conn is None:
+                    return
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(_INSERT_SQL, batch)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
         except Exception as e:
             print(f"Failed to log to database: {e}")
+    
+    def flush(self):
+        """Block until records queued so far are written"""
+        if self._writer.is_alive():
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait(timeout=5)
+    
+    def close(self):
+        """Write pending records and close the database connection (called by logging.shutdown at exit)"""
+        if self._writer.is_alive():
+            self._queue.put(self._STOP)
+            self._writer.join(timeout=5)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        super().close()
+
+
+# Formatters are stateless, so every logger shares the same instances
+CONSOLE_FORMAT = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+FILE_FORMAT = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(funcName)s:%(lineno)d - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+_db_handler: Optional[DatabaseHandler] = None
+
+
+class LocalQueueHandler(QueueHandler):
+    """Queue handler for an in-process listener - passes records through unformatted"""
+    
+    def prepare(self, record):
+        # The default prepare() flattens the message and drops exc_info, which
+        # DatabaseHandler needs for its exception columns
+        return record
+
+
+def get_db_handler() -> DatabaseHandler:
+    """Get the error database handler shared by all loggers"""
+    global _db_handler
+    if _db_handler is None:
+        _db_handler = DatabaseHandler()
+        _db_handler.setLevel(logging.ERROR)
+        _db_handler.setFormatter(FILE_FORMAT)
+    return _db_handler
 
 
 def setup_logger(name: str, level=logging.INFO) -> logging.Logger:
@@ -85,11 +210,7 @@ def setup_logger(name: str, level=logging.INFO) -> logging.Logger:
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
-    console_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(console_format)
+    console_handler.setFormatter(CONSOLE_FORMAT)
     
     # File handler (rotating)
     file_handler = RotatingFileHandler(
@@ -98,49 +219,55 @@ def setup_logger(name: str, level=logging.INFO) -> logging.Logger:
         backupCount=5
     )
     file_handler.setLevel(logging.DEBUG)
-    file_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(funcName)s:%(lineno)d - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(file_format)
+    file_handler.setFormatter(FILE_FORMAT)
     
-    # Database handler (errors only)
-    db_handler = DatabaseHandler()
-    db_handler.setLevel(logging.ERROR)
-    db_handler.setFormatter(file_format)
-    
-    # Add handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    logger.addHandler(db_handler)
+    # Callers only enqueue; a listener thread runs the console, file and
+    # database (errors only, shared) handlers
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, console_handler, file_handler, get_db_handler(),
+        respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    logger._queue_listener = listener
+    logger.addHandler(LocalQueueHandler(log_queue))
     
     return logger
 
 
-def get_recent_errors(limit: int = 50) -> list:
-    """Get recent errors from database"""
+# One row of error_logs as returned by get_recent_errors
+ErrorRow = namedtuple('ErrorRow', 'id timestamp level module function message exception')
+
+
+def get_recent_errors(limit: int = 50, before_id: Optional[int] = None) -> list:
+    """Get recent errors from database, newest first
+    
+    Pass the smallest id of the previous page as before_id to get the next
+    page (keyset pagination on the primary key). Rows are ErrorRow tuples;
+    use count_recent_errors when only counts are needed.
+    """
     try:
         conn = sqlite3.connect(ERROR_DB)
         cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT id, timestamp, level, module, function, message, exception
-            FROM error_logs
-            ORDER BY created_at DESC
-            LIMIT ?
-        """, (limit,))
+        if before_id is None:
+            cursor.execute("""
+                SELECT id, timestamp, level, module, function, message, exception
+                FROM error_logs
+                ORDER BY id DESC
+                LIMIT ?
+            """, (limit,))
+        else:
+            cursor.execute("""
+                SELECT id, timestamp, level, module, function, message, exception
+                FROM error_logs
+                WHERE id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            """, (before_id, limit))
         
-        errors = []
-        for row in cursor.fetchall():
-            errors.append({
-                'id': row[0],
-                'timestamp': row[1],
-                'level': row[2],
-                'module': row[3],
-                'function': row[4],
-                'message': row[5],
-                'exception': row[6]
-            })
+        errors = list(map(ErrorRow._make, cursor.fetchall()))
         
         conn.close()
         return errors
@@ -149,19 +276,55 @@ def get_recent_errors(limit: int = 50) -> list:
         return []
 
 
+def count_recent_errors(limit: int = 100) -> tuple:
+    """Get (total, ERROR level) counts over the most recent log entries"""
+    try:
+        conn = sqlite3.connect(ERROR_DB)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(level = 'ERROR'), 0)
+            FROM (
+                SELECT level FROM error_logs
+                ORDER BY created_at DESC
+                LIMIT ?
+            )
+        """, (limit,))
+        
+        total, errors = cursor.fetchone()
+        conn.close()
+        return total, errors
+    except Exception as e:
+        print(f"Failed to count errors: {e}")
+        return 0, 0
+
+
+CLEAR_BATCH_SIZE = 5000
+
+
 def clear_old_errors(days: int = 30):
     """Clear errors older than specified days"""
     try:
         conn = sqlite3.connect(ERROR_DB)
         cursor = conn.cursor()
         
-        cursor.execute("""
-            DELETE FROM error_logs
-            WHERE created_at < datetime('now', '-' || ? || ' days')
-        """, (days,))
+        # Delete in index-ordered batches, committing each one, so the log
+        # writer thread never waits long on a big cleanup
+        cursor.execute("SELECT datetime('now', '-' || ? || ' days')", (days,))
+        cutoff = cursor.fetchone()[0]
+        
+        deleted = 0
+        while True:
+            cursor.execute("""
+                DELETE FROM error_logs WHERE id IN (
+                    SELECT id FROM error_logs WHERE created_at < ? LIMIT ?
+                )
+            """, (cutoff, CLEAR_BATCH_SIZE))
+            conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < CLEAR_BATCH_SIZE:
+                break
         
-        deleted = cursor.rowcount
-        conn.commit()
         conn.close()
         
         return deleted
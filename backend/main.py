@@ -1,24 +1,36 @@
 from fastapi import FastAPI, HTTPException, Body, Query, Depends, Header, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
 from pydantic import BaseModel
 import os
+import re
+import json
+import hashlib
+import time
+import uuid
+import weakref
 import asyncio
-from io import BytesIO
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+except ImportError:
+    orjson = None
+from datetime import date, datetime, timedelta
 from typing import Optional
 
-from multi_user_database import MultiUserDatabase
-from user_repository import UserRepository, GlobalRepository, UserConfig, UserDailyLog
-from video_selector import VideoSelector
-from streak_calculator import StreakCalculator
+from multi_user_database import MultiUserDatabase, close_pg_pools
+from user_repository import UserRepository, GlobalRepository, AsyncRepository, TTLCache, UserConfig, UserDailyLog
+from video_selector import VideoSelector, SUBJECT_FIELDS, SUBJECT_EMOJI
+from streak_calculator import StreakCalculator, streak_motivation
 from completion_calculator import CompletionCalculator
 from telegram_bot import TelegramBot
 from auth import get_auth_manager
-from logger import app_logger, api_logger, get_recent_errors, clear_old_errors
+from logger import app_logger, api_logger, get_recent_errors, count_recent_errors, clear_old_errors
 from backup_manager import get_backup_manager
 from user_manager import get_user_manager
 from input_validator import validator
@@ -47,10 +59,113 @@ class ScheduleConfig(BaseModel):
 # Load environment variables
 load_dotenv()
 
+# Request validation patterns
+_PLAYLIST_RE = re.compile(r'youtube\.com.*list=')
+_TIME_RE = re.compile(r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$')
+
+# Concurrent uploads when sending a file to all users (large files >= 20MB
+# hold a pooled connection for much longer)
+FILE_SEND_WORKERS = 8
+LARGE_FILE_SEND_WORKERS = 4
+
+# Users fetched per query when streaming /api/admin/users as NDJSON
+USERS_STREAM_PAGE = 500
+
+# Admin dashboards poll system stats; keep recent results briefly and drop
+# them whenever backups or the error log change
+_stats_cache = TTLCache(maxsize=1, ttl=10)
+
+
+def _invalidate_system_caches():
+    _stats_cache.pop("stats")
+
+
+async def _list_backups() -> list:
+    # BackupManager caches the listing until the backup directory changes
+    return await asyncio.to_thread(backup_manager.list_backups)
+
+
+# Backup jobs started with ?background=true, newest last
+MAX_BACKUP_JOBS = 50
+_backup_jobs = {}
+_backup_tasks = set()  # keeps running job tasks referenced
+
+
+def _start_backup_job(kind: str, func, *args, **kwargs) -> dict:
+    """Run a blocking backup operation in a worker thread and track it"""
+    job = {"job_id": uuid.uuid4().hex, "kind": kind, "status": "running", "result": None}
+    _backup_jobs[job["job_id"]] = job
+    while len(_backup_jobs) > MAX_BACKUP_JOBS:
+        del _backup_jobs[next(iter(_backup_jobs))]
+    
+    async def run():
+        try:
+            job["result"] = await asyncio.to_thread(func, *args, **kwargs)
+            job["status"] = "done" if job["result"] else "failed"
+        except Exception as e:
+            api_logger.error(f"Backup job {job['job_id']} error: {e}", exc_info=True)
+            job["status"] = "failed"
+        finally:
+            _invalidate_system_caches()
+    
+    task = asyncio.create_task(run())
+    _backup_tasks.add(task)
+    task.add_done_callback(_backup_tasks.discard)
+    return job
+
+
+# Per-user locks serializing daily sends; entries vanish once no one holds them
+_send_locks = weakref.WeakValueDictionary()
+
+
+def _user_send_lock(chat_id: str) -> asyncio.Lock:
+    """Get the lock that serializes daily sends for chat_id"""
+    lock = _send_locks.get(chat_id)
+    if lock is None:
+        lock = _send_locks[chat_id] = asyncio.Lock()
+    return lock
+
+
+# Confirmation messages are sent by background workers so HTTP responses
+# don't wait on Telegram; the bounded queue pushes back when it fills up
+TELEGRAM_QUEUE_SIZE = 1000
+TELEGRAM_WORKERS = 4
+_telegram_queue = None
+
+
+async def _telegram_worker(queue: asyncio.Queue):
+    while True:
+        chat_id, message = await queue.get()
+        try:
+            await bot.send_confirmation(chat_id, message)
+        except Exception as e:
+            api_logger.error(f"Failed to send queued message to {chat_id}: {e}", exc_info=True)
+        finally:
+            queue.task_done()
+
+
+async def _queue_confirmation(chat_id: str, message: str):
+    """Hand a confirmation message to the send workers"""
+    if _telegram_queue is None:
+        await bot.send_confirmation(chat_id, message)
+        return
+    await _telegram_queue.put((chat_id, message))
+
+
+def _today_iso(_cache=[None, 0.0]) -> str:
+    """Today's date as YYYY-MM-DD, recomputed at most once a second"""
+    now = time.time()
+    if now - _cache[1] > 1:
+        _cache[0] = date.today().isoformat()
+        _cache[1] = now
+    return _cache[0]
+
 # Global instances
 db = None
 user_repo = None
 global_repo = None
+async_user_repo = None  # Awaitable repos for async handlers
+async_global_repo = None
 bot = None
 video_selector = None
 streak_calc = None
@@ -66,8 +181,7 @@ bot_thread = None  # Thread for running the bot
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token"""
     token = credentials.credentials
-    api_logger.debug(f"Verifying token: {token[:20]}...")
-    api_logger.debug(f"Using SECRET_KEY: {os.getenv('JWT_SECRET_KEY', 'default')[:10]}...")
+    api_logger.debug("Verifying token: %s...", token[:20])
     payload = auth_manager.verify_token(token)
     
     if not payload:
@@ -76,14 +190,14 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(secur
     
     # Add username to payload for convenience
     payload["username"] = payload.get("sub", "admin")
-    api_logger.debug(f"Token verified successfully for: {payload.get('username')}")
+    api_logger.debug("Token verified successfully for: %s", payload["username"])
     return payload
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize on startup"""
-    global db, user_repo, global_repo, bot, video_selector, streak_calc, completion_calc, auth_manager, backup_manager, file_manager, user_manager, bot_thread
+    global db, user_repo, global_repo, async_user_repo, async_global_repo, bot, video_selector, streak_calc, completion_calc, auth_manager, backup_manager, file_manager, user_manager, bot_thread, _telegram_queue
     
     app_logger.info("🚀 Starting Officer Priya CDS System")
     
@@ -91,10 +205,16 @@ async def lifespan(app: FastAPI):
     db = MultiUserDatabase()
     user_repo = UserRepository(db)
     global_repo = GlobalRepository(db)
+    async_user_repo = AsyncRepository(user_repo)
+    async_global_repo = AsyncRepository(global_repo)
     
     # Initialize bot
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN", "8765768664:AAFK0cbqSnKFfFoNl2a2kJF0g_mdMnoP348")
     bot = TelegramBot(bot_token)
+    _telegram_queue = asyncio.Queue(maxsize=TELEGRAM_QUEUE_SIZE)
+    telegram_workers = [
+        asyncio.create_task(_telegram_worker(_telegram_queue)) for _ in range(TELEGRAM_WORKERS)
+    ]
     
     # Initialize calculators
     video_selector = VideoSelector()
@@ -148,7 +268,7 @@ async def lifespan(app: FastAPI):
     # Start file scheduler
     try:
         from file_scheduler import FileScheduler
-        file_scheduler = FileScheduler()
+        file_scheduler = FileScheduler(bot=bot)
         file_scheduler_task = asyncio.create_task(file_scheduler.run())
         scheduler_tasks.append(file_scheduler_task)
         app_logger.info("✅ File scheduler started")
@@ -158,7 +278,7 @@ async def lifespan(app: FastAPI):
     # Start daily content scheduler
     try:
         from multi_user_scheduler import MultiUserScheduler
-        daily_scheduler = MultiUserScheduler()
+        daily_scheduler = MultiUserScheduler(bot=bot)
         daily_scheduler_task = asyncio.create_task(daily_scheduler.run_scheduler())
         scheduler_tasks.append(daily_scheduler_task)
         app_logger.info("✅ Daily content scheduler started")
@@ -179,9 +299,48 @@ async def lifespan(app: FastAPI):
             pass
     
     app_logger.info("✅ Schedulers stopped")
+    
+    # Flush queued Telegram messages, then stop the send workers
+    try:
+        await asyncio.wait_for(_telegram_queue.join(), timeout=10)
+    except asyncio.TimeoutError:
+        app_logger.warning(f"⚠️ Dropping {_telegram_queue.qsize()} unsent Telegram messages")
+    for task in telegram_workers:
+        task.cancel()
+    await asyncio.gather(*telegram_workers, return_exceptions=True)
+    _telegram_queue = None
+    
+    # Close the shared Telegram and PostgreSQL connection pools
+    await bot.close()
+    close_pg_pools()
+
 
+if orjson is not None:
+    class AppJSONResponse(ORJSONResponse):
+        """orjson response that, like json.dumps, accepts non-string dict keys"""
+        
+        def render(self, content) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    
+    def _dumps_line(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+else:
+    AppJSONResponse = JSONResponse
+    
+    def _dumps_line(obj) -> bytes:
+        return (json.dumps(obj) + "\n").encode()
 
-app = FastAPI(title="Officer Priya CDS System", lifespan=lifespan)
+
+def _etag_response(content, if_none_match: Optional[str]) -> Response:
+    """JSON response with a weak ETag; 304 with no body if the client has it"""
+    response = AppJSONResponse(content)
+    etag = 'W/"%s"' % hashlib.blake2b(response.body, digest_size=8).hexdigest()
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return response
+
+app = FastAPI(title="Officer Priya CDS System", lifespan=lifespan, default_response_class=AppJSONResponse)
 
 # Rate limiting middleware
 app.add_middleware(RateLimiter, requests_per_minute=60, requests_per_hour=1000)
@@ -196,6 +355,25 @@ app.add_middleware(
 )
 
 
+# File downloads go out untouched so they keep sendfile and aren't
+# recompressed (backups are already zstd/gzip)
+_NO_GZIP_RE = re.compile(r'^/api/files/[^/]+/download$|^/api/system/backups/(?!jobs/)[^/]+$')
+
+
+class APIGZipMiddleware(GZipMiddleware):
+    """GZip API responses for clients that accept it, except file downloads"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and _NO_GZIP_RE.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Response compression for large JSON lists (errors, backups, users)
+app.add_middleware(APIGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
 @app.get("/")
 async def root():
     return {"message": "Officer Priya CDS System API"}
@@ -284,13 +462,19 @@ async def change_password(
 
 @app.get("/api/system/errors")
 async def get_system_errors(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
     payload: dict = Depends(verify_token)
 ):
-    """Get recent system errors"""
+    """Get recent system errors, newest first"""
     try:
-        errors = get_recent_errors(limit=limit)
-        return {"errors": errors, "total": len(errors)}
+        errors = await asyncio.to_thread(get_recent_errors, limit, cursor)
+        next_cursor = errors[-1].id if len(errors) == limit else None
+        return {
+            "errors": [error._asdict() for error in errors],
+            "total": len(errors),
+            "next_cursor": next_cursor
+        }
     except Exception as e:
         api_logger.error(f"Failed to fetch errors: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch errors")
@@ -303,7 +487,8 @@ async def clear_system_errors(
 ):
     """Clear old system errors"""
     try:
-        deleted = clear_old_errors(days=days)
+        deleted = await asyncio.to_thread(clear_old_errors, days)
+        _invalidate_system_caches()
         api_logger.info(f"Cleared {deleted} old errors")
         return {"success": True, "deleted": deleted}
     except Exception as e:
@@ -312,11 +497,14 @@ async def clear_system_errors(
 
 
 @app.get("/api/system/backups")
-async def list_backups(payload: dict = Depends(verify_token)):
+async def list_backups(
+    if_none_match: Optional[str] = Header(None),
+    payload: dict = Depends(verify_token)
+):
     """List all available backups"""
     try:
-        backups = backup_manager.list_backups()
-        return {"backups": backups, "total": len(backups)}
+        backups = await _list_backups()
+        return _etag_response({"backups": backups, "total": len(backups)}, if_none_match)
     except Exception as e:
         api_logger.error(f"Failed to list backups: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to list backups")
@@ -325,11 +513,20 @@ async def list_backups(payload: dict = Depends(verify_token)):
 @app.post("/api/system/backups")
 async def create_backup(
     compress: bool = True,
+    level: int = Query(3, ge=1, le=19, description="zstd compression level"),
+    background: bool = Query(False, description="Return 202 with a job id instead of waiting"),
     payload: dict = Depends(verify_token)
 ):
     """Create a new backup"""
     try:
-        backup_path = backup_manager.create_backup(compress=compress)
+        if background:
+            job = _start_backup_job("create", backup_manager.create_backup, compress=compress, level=level)
+            return AppJSONResponse(job, status_code=202)
+        
+        backup_path = await asyncio.to_thread(
+            backup_manager.create_backup, compress=compress, level=level
+        )
+        _invalidate_system_caches()
         
         if not backup_path:
             raise HTTPException(status_code=500, detail="Backup creation failed")
@@ -351,11 +548,17 @@ async def create_backup(
 @app.post("/api/system/backups/restore")
 async def restore_backup(
     backup_path: str = Body(..., embed=True),
+    background: bool = Query(False, description="Return 202 with a job id instead of waiting"),
     payload: dict = Depends(verify_token)
 ):
     """Restore database from backup"""
     try:
-        success = backup_manager.restore_backup(backup_path)
+        if background:
+            job = _start_backup_job("restore", backup_manager.restore_backup, backup_path)
+            return AppJSONResponse(job, status_code=202)
+        
+        success = await asyncio.to_thread(backup_manager.restore_backup, backup_path)
+        _invalidate_system_caches()
         
         if not success:
             raise HTTPException(status_code=500, detail="Backup restoration failed")
@@ -373,6 +576,18 @@ async def restore_backup(
         raise HTTPException(status_code=500, detail="Backup restoration failed")
 
 
+@app.get("/api/system/backups/jobs/{job_id}")
+async def get_backup_job(
+    job_id: str,
+    payload: dict = Depends(verify_token)
+):
+    """Get the status of a background backup job"""
+    job = _backup_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
 @app.delete("/api/system/backups")
 async def delete_backup(
     backup_path: str = Query(...),
@@ -380,7 +595,8 @@ async def delete_backup(
 ):
     """Delete a backup"""
     try:
-        success = backup_manager.delete_backup(backup_path)
+        success = await asyncio.to_thread(backup_manager.delete_backup, backup_path)
+        _invalidate_system_caches()
         
         if not success:
             raise HTTPException(status_code=500, detail="Backup deletion failed")
@@ -395,25 +611,55 @@ async def delete_backup(
         raise HTTPException(status_code=500, detail="Backup deletion failed")
 
 
+BACKUP_MEDIA_TYPES = {
+    '.zst': 'application/zstd',
+    '.gz': 'application/gzip',
+}
+
+
+@app.get("/api/system/backups/{name}")
+async def download_backup(
+    name: str,
+    payload: dict = Depends(verify_token)
+):
+    """Download a backup file"""
+    backup_file = backup_manager.get_backup_file(name)
+    if not backup_file:
+        raise HTTPException(status_code=404, detail="Backup not found")
+    
+    # FileResponse streams the file with sendfile where the server supports it
+    return FileResponse(
+        path=backup_file,
+        filename=backup_file.name,
+        media_type=BACKUP_MEDIA_TYPES.get(backup_file.suffix, 'application/octet-stream')
+    )
+
+
 @app.get("/api/system/stats")
-async def get_system_stats(payload: dict = Depends(verify_token)):
+async def get_system_stats(
+    if_none_match: Optional[str] = Header(None),
+    payload: dict = Depends(verify_token)
+):
     """Get system statistics"""
     try:
-        users = user_repo.get_all_users()
-        errors = get_recent_errors(limit=100)
-        backups = backup_manager.list_backups()
-        
-        # Calculate stats
-        total_users = len(users)
-        active_users = sum(1 for u in users if u.is_active)
-        total_errors = len(errors)
-        recent_errors = sum(1 for e in errors if e['level'] == 'ERROR')
+        cached = _stats_cache.get("stats")
+        if cached is not None:
+            return _etag_response(cached, if_none_match)
+        
+        # Counts are aggregated in SQL rather than over fetched rows; the
+        # three lookups are independent, so run them concurrently
+        (total_users, active_users), (total_errors, recent_errors), backups = await asyncio.gather(
+            async_user_repo.count_users(),
+            asyncio.to_thread(count_recent_errors, 100),
+            _list_backups()
+        )
+        
         total_backups = len(backups)
         
         # Get latest backup info
         latest_backup = backups[0] if backups else None
         
-        return {
+        stats = {
             "users": {
                 "total": total_users,
                 "active": active_users,
@@ -432,6 +678,8 @@ async def get_system_stats(payload: dict = Depends(verify_token)):
                 "version": "2.0.0"
             }
         }
+        _stats_cache.put("stats", stats)
+        return _etag_response(stats, if_none_match)
     except Exception as e:
         api_logger.error(f"Failed to fetch system stats: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch system stats")
@@ -442,145 +690,93 @@ async def get_system_stats(payload: dict = Depends(verify_token)):
 # ============================================================================
 
 
+async def _perform_daily_send(user, config) -> dict:
+    """Send today's playlists to a user and record the day; callers hold the user's send lock"""
+    today = _today_iso()
+    
+    # Collect all playlists scheduled for today
+    playlists_to_send = []
+    
+    selected = video_selector.select_next_batch([
+        (getattr(config, index_field), getattr(config, playlist_field))
+        for playlist_field, index_field in SUBJECT_FIELDS.values()
+    ])
+    for (subject, (_, index_field)), (number, url) in zip(SUBJECT_FIELDS.items(), selected):
+        playlists_to_send.append({
+            'subject': subject.capitalize(),
+            'number': number,
+            'url': url,
+            'update_field': index_field
+        })
+    
+    # Increment day count
+    config.day_count += 1
+    current_day = config.day_count
+    
+    # Build message with all playlists
+    parts = [f"📚 Day {current_day} - Your Study Materials", ""]
+    
+    for playlist in playlists_to_send:
+        emoji = SUBJECT_EMOJI.get(playlist['subject'].lower(), '📚')
+        parts.append(f"{emoji} {playlist['subject']} #{playlist['number']}")
+        parts.append(playlist['url'])
+        parts.append("")
+        
+        # Update indices
+        setattr(config, playlist['update_field'], playlist['number'])
+    
+    parts.append("✅ Mark as DONE when completed\n❌ Mark as NOT DONE if you need more time")
+    message = "\n".join(parts)
+    
+    # Create daily log entry (store first playlist for compatibility)
+    first_playlist = playlists_to_send[0]
+    log = UserDailyLog(
+        user_id=user.id,
+        day_number=current_day,
+        date=today,
+        english_video_number=first_playlist['number'],
+        gk_subject=first_playlist['subject'],
+        gk_video_number=first_playlist['number'],
+        status="PENDING"
+    )
+    
+    # Save log, config and last active while the Telegram message is queued
+    # (or sent, when no workers are running); neither depends on the other.
+    # Send failures are logged by the worker; the day is recorded either
+    # way, as before.
+    await asyncio.gather(
+        async_user_repo.commit_daily(log, config),
+        _queue_confirmation(user.chat_id, message)
+    )
+    
+    return {
+        "success": True,
+        "user_id": user.id,
+        "day": current_day,
+        "playlists_sent": [p['subject'] for p in playlists_to_send]
+    }
+
+
 @app.post("/api/send-daily")
 async def send_daily(chat_id: str = Query(..., description="User's Telegram chat ID")):
     """Execute daily video delivery workflow for a specific user"""
     try:
         api_logger.info(f"Send daily request for chat_id: {chat_id}")
         
-        # Get user by chat ID
-        user = user_repo.get_user_by_chat_id(chat_id)
-        if not user:
-            api_logger.warning(f"User not found: {chat_id}")
-            raise HTTPException(status_code=404, detail="User not found. Please send /start to the bot first.")
-        
-        # Load user config
-        config = user_repo.get_user_config(user.id)
-        if not config:
-            api_logger.error(f"User configuration not found for user_id: {user.id}")
-            raise HTTPException(status_code=500, detail="User configuration not found")
-        
-        today = datetime.now().strftime("%Y-%m-%d")
-        today_weekday = datetime.now().weekday()
-        
-        # Collect all playlists scheduled for today
-        playlists_to_send = []
-        
-        # Check English
-        english_num, english_url = video_selector.select_next_english(
-            config.english_index, config.english_playlist
-        )
-        playlists_to_send.append({
-            'subject': 'English',
-            'number': english_num,
-            'url': english_url,
-            'update_field': 'english_index'
-        })
-        
-        # Check History
-        history_num, history_url = video_selector.select_next_english(
-            config.history_index, config.history_playlist
-        )
-        playlists_to_send.append({
-            'subject': 'History',
-            'number': history_num,
-            'url': history_url,
-            'update_field': 'history_index'
-        })
-        
-        # Check Polity
-        polity_num, polity_url = video_selector.select_next_english(
-            config.polity_index, config.polity_playlist
-        )
-        playlists_to_send.append({
-            'subject': 'Polity',
-            'number': polity_num,
-            'url': polity_url,
-            'update_field': 'polity_index'
-        })
-        
-        # Check Geography
-        geography_num, geography_url = video_selector.select_next_english(
-            config.geography_index, config.geography_playlist
-        )
-        playlists_to_send.append({
-            'subject': 'Geography',
-            'number': geography_num,
-            'url': geography_url,
-            'update_field': 'geography_index'
-        })
-        
-        # Check Economics
-        economics_num, economics_url = video_selector.select_next_english(
-            config.economics_index, config.economics_playlist
-        )
-        playlists_to_send.append({
-            'subject': 'Economics',
-            'number': economics_num,
-            'url': economics_url,
-            'update_field': 'economics_index'
-        })
-        
-        # Increment day count
-        config.day_count += 1
-        current_day = config.day_count
-        
-        # Build message with all playlists
-        message = f"📚 Day {current_day} - Your Study Materials\n\n"
-        
-        for playlist in playlists_to_send:
-            emoji = {
-                'English': '🗣️',
-                'History': '🏛️',
-                'Polity': '⚖️',
-                'Geography': '🌍',
-                'Economics': '💰'
-            }.get(playlist['subject'], '📚')
+        async with _user_send_lock(chat_id):
+            # Get user by chat ID
+            user = await async_user_repo.get_user_by_chat_id(chat_id)
+            if not user:
+                api_logger.warning(f"User not found: {chat_id}")
+                raise HTTPException(status_code=404, detail="User not found. Please send /start to the bot first.")
             
-            message += f"{emoji} {playlist['subject']} #{playlist['number']}\n{playlist['url']}\n\n"
+            # Load user config
+            config = await async_user_repo.get_user_config(user.id, fresh=True)
+            if not config:
+                api_logger.error(f"User configuration not found for user_id: {user.id}")
+                raise HTTPException(status_code=500, detail="User configuration not found")
             
-            # Update indices
-            if playlist['update_field'] == 'english_index':
-                config.english_index = playlist['number']
-            elif playlist['update_field'] == 'history_index':
-                config.history_index = playlist['number']
-            elif playlist['update_field'] == 'polity_index':
-                config.polity_index = playlist['number']
-            elif playlist['update_field'] == 'geography_index':
-                config.geography_index = playlist['number']
-            elif playlist['update_field'] == 'economics_index':
-                config.economics_index = playlist['number']
-        
-        message += "✅ Mark as DONE when completed\n❌ Mark as NOT DONE if you need more time"
-        
-        # Send Telegram message
-        await bot.send_confirmation(chat_id, message)
-        
-        # Create daily log entry (store first playlist for compatibility)
-        first_playlist = playlists_to_send[0]
-        log = UserDailyLog(
-            user_id=user.id,
-            day_number=current_day,
-            date=datetime.now().strftime("%Y-%m-%d"),
-            english_video_number=first_playlist['number'],
-            gk_subject=first_playlist['subject'],
-            gk_video_number=first_playlist['number'],
-            status="PENDING"
-        )
-        user_repo.insert_user_log(log)
-        
-        # Update config in database
-        user_repo.update_user_config(config)
-        
-        # Update last active
-        user_repo.update_last_active(user.id)
-        
-        return {
-            "success": True,
-            "user_id": user.id,
-            "day": current_day,
-            "playlists_sent": [p['subject'] for p in playlists_to_send]
-        }
+            return await _perform_daily_send(user, config)
     
     except HTTPException:
         raise
@@ -607,7 +803,7 @@ async def telegram_webhook(update: dict):
                 username = user_info.get("username", "")
                 
                 # Check if user exists
-                existing_user = user_repo.get_user_by_chat_id(str(chat_id))
+                existing_user = await async_user_repo.get_user_by_chat_id(str(chat_id))
                 
                 if not existing_user:
                     # Create new user
@@ -619,7 +815,7 @@ async def telegram_webhook(update: dict):
                         username=username,
                         is_active=True
                     )
-                    user_repo.insert_user(new_user)
+                    await async_user_repo.insert_user(new_user)
                     
                     welcome_msg = f"👋 Welcome {first_name}!\n\n"
                     welcome_msg += "🎯 Officer Priya CDS Preparation Bot\n\n"
@@ -637,7 +833,7 @@ async def telegram_webhook(update: dict):
                     welcome_msg += "Keep up the great work! 🔥"
                 
                 # Send welcome message
-                await bot.send_confirmation(str(chat_id), welcome_msg)
+                await _queue_confirmation(str(chat_id), welcome_msg)
                 
                 return {"ok": True, "message": "Welcome message sent"}
             
@@ -650,7 +846,7 @@ async def telegram_webhook(update: dict):
                 help_msg += "You'll receive daily study materials automatically.\n"
                 help_msg += "Use the Done/Not Done buttons to track your progress!"
                 
-                await bot.send_confirmation(str(chat_id), help_msg)
+                await _queue_confirmation(str(chat_id), help_msg)
                 return {"ok": True, "message": "Help message sent"}
             
             # For other messages, just acknowledge
@@ -679,22 +875,13 @@ async def telegram_webhook(update: dict):
                 await bot.answer_callback(callback_query_id, "User not found")
             return {"ok": False, "error": "User ID not provided"}
         
-        # Update log status for this user
-        success = user_repo.update_user_log_status(user_id, day, status)
-        if not success:
+        # Update log status and stored streak for this user
+        new_streak = await async_user_repo.update_log_status_and_streak(user_id, day, status)
+        if new_streak is None:
             if callback_query_id:
                 await bot.answer_callback(callback_query_id, "Failed to update")
             return {"ok": False, "error": "Failed to update status"}
         
-        # Recalculate streak for this user
-        logs = user_repo.get_user_logs(user_id)
-        config = user_repo.get_user_config(user_id)
-        
-        # Calculate streak using logs directly (UserDailyLog has is_completed() method)
-        new_streak = streak_calc.calculate_streak(logs)
-        config.streak = new_streak
-        user_repo.update_user_config(config)
-        
         # Answer callback query (removes loading state)
         status_text = "Done ✅" if status == "DONE" else "Not Done ❌"
         if callback_query_id:
@@ -704,29 +891,15 @@ async def telegram_webhook(update: dict):
         chat_id = callback_query.get("message", {}).get("chat", {}).get("id")
         if chat_id:
             if status == "DONE":
-                # Motivational messages for completion
-                if new_streak == 1:
-                    motivation = "🎉 Great start! First day completed!"
-                elif new_streak < 7:
-                    motivation = f"💪 {new_streak} days strong! Keep the momentum!"
-                elif new_streak < 14:
-                    motivation = f"🔥 {new_streak} day streak! You're on fire!"
-                elif new_streak < 30:
-                    motivation = f"⭐ {new_streak} days! Consistency is your superpower!"
-                elif new_streak < 60:
-                    motivation = f"🏆 {new_streak} day streak! Incredible dedication!"
-                else:
-                    motivation = f"👑 {new_streak} days! You're a legend!"
-                
                 confirmation_msg = f"✅ *Day {day} Completed!*\n\n"
                 confirmation_msg += f"🔥 Current Streak: *{new_streak} days*\n\n"
-                confirmation_msg += motivation
+                confirmation_msg += streak_motivation(new_streak)
             else:
                 confirmation_msg = f"📝 *Day {day} marked as Not Done*\n\n"
                 confirmation_msg += "Don't worry! You can try again tomorrow.\n"
                 confirmation_msg += "Consistency matters more than perfection! 💪"
             
-            await bot.send_confirmation(str(chat_id), confirmation_msg)
+            await _queue_confirmation(str(chat_id), confirmation_msg)
         
         return {"ok": True, "streak": new_streak}
     
@@ -746,27 +919,24 @@ async def get_metrics(chat_id: str = Query(..., description="User's Telegram cha
     """Return current day, completion percentages, streak for a specific user"""
     try:
         # Get user
-        user = user_repo.get_user_by_chat_id(chat_id)
+        user = await async_user_repo.get_user_by_chat_id(chat_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        config = user_repo.get_user_config(user.id)
-        logs = user_repo.get_user_logs(user.id)
-        
-        # Calculate completion percentages using the logs directly
-        # (UserDailyLog has is_completed() method)
-        overall = completion_calc.calculate_overall(logs)
-        weekly = completion_calc.calculate_weekly(logs)
+        config = await async_user_repo.get_user_config(user.id)
+        stats = await async_user_repo.get_user_stats(user.id)
         
-        completed_count = sum(1 for log in logs if log.is_completed())
+        # Completion percentages from counts aggregated in SQL
+        overall = completion_calc.calculate_from_counts(stats["done"], stats["total"])
+        weekly = completion_calc.calculate_from_counts(stats["weekly_done"], stats["weekly_total"])
         
         return {
             "current_day": config.day_count,
             "overall_completion": overall,
             "weekly_completion": weekly,
             "streak": config.streak,
-            "total_days": len(logs),
-            "completed_days": completed_count,
+            "total_days": stats["total"],
+            "completed_days": stats["done"],
             "user_name": user.first_name
         }
     except HTTPException:
@@ -777,19 +947,19 @@ async def get_metrics(chat_id: str = Query(..., description="User's Telegram cha
 
 @app.get("/api/dashboard/logs")
 async def get_logs(chat_id: str = Query(..., description="User's Telegram chat ID"), 
-                   limit: int = 50, offset: int = 0):
+                   limit: int = Query(50, ge=1, le=500), offset: int = Query(0, ge=0)):
     """Return paginated daily logs for a specific user"""
     try:
         # Get user
-        user = user_repo.get_user_by_chat_id(chat_id)
+        user = await async_user_repo.get_user_by_chat_id(chat_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        all_logs = user_repo.get_user_logs(user.id)
-        total = len(all_logs)
-        
-        # Apply pagination
-        paginated_logs = all_logs[offset:offset + limit]
+        # Fetch only the requested page plus the total count, concurrently
+        total, paginated_logs = await asyncio.gather(
+            async_user_repo.count_user_logs(user.id),
+            async_user_repo.get_user_logs_page(user.id, limit, offset)
+        )
         
         # Convert to dict
         logs_data = []
@@ -802,8 +972,8 @@ async def get_logs(chat_id: str = Query(..., description="User's Telegram chat I
                 "gk_subject": log.gk_subject,
                 "gk_video_number": log.gk_video_number,
                 "status": log.status,
-                "created_at": str(log.created_at) if log.created_at else None,
-                "updated_at": str(log.updated_at) if log.updated_at else None
+                "created_at": log.created_at,
+                "updated_at": log.updated_at
             })
         
         return {
@@ -855,36 +1025,23 @@ async def update_playlist(data: PlaylistUpdate, chat_id: str = Query(None, descr
     """Update playlist URL for a subject (GLOBAL - affects all users)"""
     try:
         # Validate YouTube playlist URL
-        import re
-        if not re.search(r'youtube\.com.*list=', data.url):
+        if not _PLAYLIST_RE.search(data.url):
             raise HTTPException(status_code=400, detail="Invalid YouTube playlist URL")
         
         subject_lower = data.subject.lower()
         
         # Check if it's a default subject
-        default_subjects = ["english", "history", "polity", "geography", "economics"]
+        fields = SUBJECT_FIELDS.get(subject_lower)
         
-        if subject_lower in default_subjects:
+        if fields:
             # Update default subject in global_config
-            config = global_repo.get_global_config()
+            config = global_repo.get_global_config(fresh=True)
             if not config:
                 raise HTTPException(status_code=500, detail="Global configuration not found")
             
-            if subject_lower == "english":
-                config.english_playlist = data.url
-                config.english_index = 0
-            elif subject_lower == "history":
-                config.history_playlist = data.url
-                config.history_index = 0
-            elif subject_lower == "polity":
-                config.polity_playlist = data.url
-                config.polity_index = 0
-            elif subject_lower == "geography":
-                config.geography_playlist = data.url
-                config.geography_index = 0
-            elif subject_lower == "economics":
-                config.economics_playlist = data.url
-                config.economics_index = 0
+            playlist_field, index_field = fields
+            setattr(config, playlist_field, data.url)
+            setattr(config, index_field, 0)
             
             global_repo.update_global_config(config)
         else:
@@ -926,25 +1083,15 @@ async def update_playlist(data: PlaylistUpdate, chat_id: str = Query(None, descr
 async def delete_custom_playlist(subject: str, chat_id: str = Query(None, description="User's Telegram chat ID (optional for global mode)")):
     """Delete a playlist - clears URL for default subjects, removes custom subjects"""
     try:
-        default_subjects = ["english", "history", "polity", "geography", "economics"]
         subject_lower = subject.lower()
         
-        if subject_lower in default_subjects:
+        if subject_lower in SUBJECT_FIELDS:
             # For default subjects, just clear the URL (don't delete from config)
-            config = global_repo.get_global_config()
+            config = global_repo.get_global_config(fresh=True)
             if not config:
                 raise HTTPException(status_code=500, detail="Global configuration not found")
             
-            if subject_lower == "english":
-                config.english_playlist = ""
-            elif subject_lower == "history":
-                config.history_playlist = ""
-            elif subject_lower == "polity":
-                config.polity_playlist = ""
-            elif subject_lower == "geography":
-                config.geography_playlist = ""
-            elif subject_lower == "economics":
-                config.economics_playlist = ""
+            setattr(config, SUBJECT_FIELDS[subject_lower][0], "")
             
             global_repo.update_global_config(config)
             
@@ -984,27 +1131,21 @@ async def delete_custom_playlist(subject: str, chat_id: str = Query(None, descri
 async def reset_progress(chat_id: str = Query(..., description="User's Telegram chat ID")):
     """Reset all progress for a specific user"""
     try:
-        user = user_repo.get_user_by_chat_id(chat_id)
+        user = await async_user_repo.get_user_by_chat_id(chat_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        config = user_repo.get_user_config(user.id)
+        config = await async_user_repo.get_user_config(user.id, fresh=True)
         
         # Reset all indices and counters
-        config.english_index = 0
-        config.history_index = 0
-        config.polity_index = 0
-        config.geography_index = 0
-        config.economics_index = 0
+        for _, index_field in SUBJECT_FIELDS.values():
+            setattr(config, index_field, 0)
         config.gk_rotation_index = 0
         config.day_count = 0
         config.streak = 0
         
-        # Clear all logs for this user
-        user_repo.clear_user_logs(user.id)
-        
-        # Update config
-        user_repo.update_user_config(config)
+        # Clear all logs for this user and save the config together
+        await async_user_repo.reset_user_progress(config)
         
         return {"success": True}
     except HTTPException:
@@ -1018,35 +1159,22 @@ async def reset_global_progress():
     """Reset global progress (affects ALL users)"""
     try:
         # Get global config
-        config = global_repo.get_global_config()
+        config = await async_global_repo.get_global_config(fresh=True)
         if not config:
             raise HTTPException(status_code=500, detail="Global configuration not found")
         
         # Reset all global indices and counters
         config.current_day = 0
-        config.english_index = 0
-        config.history_index = 0
-        config.polity_index = 0
-        config.geography_index = 0
-        config.economics_index = 0
+        for _, index_field in SUBJECT_FIELDS.values():
+            setattr(config, index_field, 0)
         
         # Update global config
-        global_repo.update_global_config(config)
+        await async_global_repo.update_global_config(config)
         
         # Clear all user logs AND reset streaks
-        users = user_repo.get_all_users()
-        for user in users:
-            # Clear logs
-            user_repo.clear_user_logs(user.id)
-            
-            # Reset user streak and day count
-            user_config = user_repo.get_user_config(user.id)
-            if user_config:
-                user_config.streak = 0
-                user_config.day_count = 0
-                user_repo.update_user_config(user_config)
-        
-        return {"success": True, "message": f"Global progress reset. Cleared logs and streaks for {len(users)} users."}
+        user_count = await async_user_repo.reset_all_users_progress()
+        
+        return {"success": True, "message": f"Global progress reset. Cleared logs and streaks for {user_count} users."}
     except HTTPException:
         raise
     except Exception as e:
@@ -1057,20 +1185,25 @@ async def reset_global_progress():
 async def send_now(chat_id: str = Query(..., description="User's Telegram chat ID")):
     """Manually trigger daily send for a specific user"""
     try:
-        user = user_repo.get_user_by_chat_id(chat_id)
+        user = await async_user_repo.get_user_by_chat_id(chat_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        # Check if already sent today
-        logs = user_repo.get_user_logs(user.id)
-        
-        today = datetime.now().strftime("%Y-%m-%d")
-        if logs and len(logs) > 0 and logs[0].date == today:
-            raise HTTPException(status_code=400, detail="Already sent today")
-        
-        # Call send_daily endpoint
-        result = await send_daily(chat_id=chat_id)
-        return result
+        # Check and send under the same lock so concurrent calls can't both
+        # pass the "already sent" check
+        async with _user_send_lock(chat_id):
+            # Both are reads; look them up together
+            already_sent, config = await asyncio.gather(
+                async_user_repo.log_exists_for_date(user.id, _today_iso()),
+                async_user_repo.get_user_config(user.id, fresh=True)
+            )
+            if already_sent:
+                raise HTTPException(status_code=400, detail="Already sent today")
+            
+            if not config:
+                raise HTTPException(status_code=500, detail="User configuration not found")
+            
+            return await _perform_daily_send(user, config)
     except HTTPException:
         raise
     except Exception as e:
@@ -1104,11 +1237,10 @@ async def update_schedule(schedule: ScheduleConfig, chat_id: str = Query(None, d
     """Update schedule configuration (GLOBAL - affects all users)"""
     try:
         # Validate time format
-        import re
-        if not re.match(r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$', schedule.time):
+        if not _TIME_RE.match(schedule.time):
             raise HTTPException(status_code=400, detail="Invalid time format. Use HH:MM")
         
-        config = global_repo.get_global_config()
+        config = global_repo.get_global_config(fresh=True)
         if not config:
             raise HTTPException(status_code=500, detail="Global configuration not found")
         
@@ -1212,65 +1344,76 @@ async def get_schedule_summary(payload: dict = Depends(verify_token)):
 
 
 @app.get("/api/admin/users")
-async def get_all_users():
+async def get_all_users(stream: bool = Query(False, description="Stream users as NDJSON")):
     """Get all registered users (admin endpoint)"""
     try:
-        users = user_repo.get_all_users()
+        if stream:
+            return StreamingResponse(_stream_users_with_stats(), media_type="application/x-ndjson")
         
-        users_data = []
-        for user in users:
-            config = user_repo.get_user_config(user.id)
-            logs = user_repo.get_user_logs(user.id)
-            
-            users_data.append({
-                "id": user.id,
-                "chat_id": user.chat_id,
-                "username": user.username,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "is_active": user.is_active,
-                "created_at": str(user.created_at) if user.created_at else None,
-                "last_active": str(user.last_active) if user.last_active else None,
-                "day_count": config.day_count if config else 0,
-                "streak": config.streak if config else 0,
-                "total_logs": len(logs)
-            })
+        users_data = [
+            _user_row_payload(row)
+            for row in await async_global_repo.get_all_users_with_stats()
+        ]
         
         return {"users": users_data, "total": len(users_data)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _stream_users_with_stats():
+    """NDJSON lines of users with stats, read a page at a time in worker threads"""
+    # Each page opens and closes its own connection, so nothing is held
+    # open (or shared between threads) while the client reads
+    after = None
+    while True:
+        rows = await async_global_repo.get_users_with_stats_page(after, USERS_STREAM_PAGE)
+        for row in rows:
+            yield _dumps_line(_user_row_payload(row))
+        if len(rows) < USERS_STREAM_PAGE:
+            return
+        after = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+def _user_row_payload(row: dict) -> dict:
+    """Shape a users-with-stats row for the admin API"""
+    return {
+        "id": row["id"],
+        "chat_id": row["chat_id"],
+        "username": row["username"],
+        "first_name": row["first_name"],
+        "last_name": row["last_name"],
+        "is_active": row["is_active"],
+        "created_at": row["created_at"],
+        "last_active": row["last_active"],
+        "day_count": row["day_count"],
+        "streak": row["streak"],
+        "total_logs": row["total_logs"]
+    }
+
+
 @app.post("/api/admin/send-file")
 async def send_file_now(file_id: str = Body(..., embed=True), chat_id: str = Query(None)):
     """Send a file immediately to a user or ALL users (global mode)"""
-    import time
     start_time = time.time()
     
     try:
-        print(f"\n{'='*60}")
-        print(f"📤 SEND FILE REQUEST RECEIVED")
-        print(f"   File ID: {file_id}")
-        print(f"   Chat ID: {chat_id or 'ALL USERS (global)'}")
-        print(f"{'='*60}")
+        api_logger.info("Send file request: %s to %s", file_id, chat_id or "all users")
         
         # Get file metadata
         metadata = file_manager.get_file_metadata(file_id)
         
         if not metadata:
-            print(f"❌ File not found in database: {file_id}")
+            api_logger.warning("File not found in database: %s", file_id)
             raise HTTPException(status_code=404, detail="File not found")
         
-        print(f"✅ File metadata found: {metadata['original_name']} ({metadata['file_size']} bytes)")
+        api_logger.debug("File metadata found: %s (%s bytes)", metadata['original_name'], metadata['file_size'])
         
         # Get file path
         file_path = file_manager.get_file_path(file_id)
         if not file_path or not file_path.exists():
-            print(f"❌ File not found on disk: {file_path}")
+            api_logger.warning("File not found on disk: %s", file_path)
             raise HTTPException(status_code=404, detail="File not found on disk")
         
-        print(f"✅ File exists on disk: {file_path}")
-        
         file_type = metadata['file_type']
         caption = f"📄 {metadata['original_name']}"
         
@@ -1278,23 +1421,24 @@ async def send_file_now(file_id: str = Body(..., embed=True), chat_id: str = Que
         if not chat_id:
             users = user_repo.get_all_users()
             if not users:
-                print(f"❌ No users found")
+                api_logger.warning("No users found for file %s", file_id)
                 raise HTTPException(status_code=404, detail="No users found")
             
-            print(f"📊 Sending to {len(users)} users...")
+            api_logger.debug("Sending to %d users", len(users))
             
-            # For large files (>20MB), send sequentially to avoid pool timeout
-            # For smaller files, send in parallel
+            # Bounded fan-out: the bot's connection pool is shared with the
+            # schedulers, and large uploads hold a connection for longer.
+            # The bot also paces file sends under Telegram's rate limit.
             file_size_mb = metadata['file_size'] / (1024 * 1024)
-            send_parallel = file_size_mb < 20
+            workers = FILE_SEND_WORKERS if file_size_mb < 20 else LARGE_FILE_SEND_WORKERS
+            send_sem = asyncio.Semaphore(workers)
+            api_logger.debug("Sending with up to %d concurrent uploads", workers)
             
-            if send_parallel:
-                print(f"  Using parallel sending (file < 20MB)")
-                # Send to all users in parallel
-                async def send_to_user(user):
+            async def send_to_user(user):
+                async with send_sem:
                     user_start = time.time()
                     try:
-                        print(f"  → Starting send to {user.first_name} ({user.chat_id})...")
+                        api_logger.debug("Starting send to %s (%s)", user.first_name, user.chat_id)
                         success, error = await bot.send_file_with_retry(
                             user.chat_id, 
                             str(file_path), 
@@ -1304,51 +1448,25 @@ async def send_file_now(file_id: str = Body(..., embed=True), chat_id: str = Que
                         )
                         elapsed = time.time() - user_start
                         if success:
-                            print(f"  ✅ Sent to {user.first_name} in {elapsed:.1f}s")
+                            api_logger.debug("Sent to %s in %.1fs", user.first_name, elapsed)
                         else:
-                            print(f"  ❌ Failed to send to {user.first_name}: {error}")
+                            api_logger.warning("Failed to send to %s: %s", user.first_name, error)
                         return (user, success, error)
                     except Exception as e:
                         elapsed = time.time() - user_start
-                        print(f"  ❌ Exception sending to {user.first_name} after {elapsed:.1f}s: {e}")
+                        api_logger.warning("Exception sending to %s after %.1fs: %s", user.first_name, elapsed, e)
                         return (user, False, str(e))
-                
-                # Send to all users concurrently
-                results = await asyncio.gather(*[send_to_user(user) for user in users])
-            else:
-                print(f"  Using sequential sending (file >= 20MB)")
-                # Send to users one by one (sequential)
-                results = []
-                for user in users:
-                    user_start = time.time()
-                    try:
-                        print(f"  → Sending to {user.first_name} ({user.chat_id})...")
-                        success, error = await bot.send_file_with_retry(
-                            user.chat_id, 
-                            str(file_path), 
-                            caption, 
-                            file_type,
-                            max_retries=2
-                        )
-                        elapsed = time.time() - user_start
-                        if success:
-                            print(f"  ✅ Sent to {user.first_name} in {elapsed:.1f}s")
-                        else:
-                            print(f"  ❌ Failed to send to {user.first_name}: {error}")
-                        results.append((user, success, error))
-                    except Exception as e:
-                        elapsed = time.time() - user_start
-                        print(f"  ❌ Exception sending to {user.first_name} after {elapsed:.1f}s: {e}")
-                        results.append((user, False, str(e)))
+            
+            # Upload to the first user alone; the bot then re-sends the
+            # file to everyone else by its Telegram file_id
+            first = await send_to_user(users[0])
+            results = [first] + await asyncio.gather(*[send_to_user(user) for user in users[1:]])
             
             success_count = sum(1 for _, success, _ in results if success)
             failed_users = [(user.first_name, error) for user, success, error in results if not success]
             
             total_time = time.time() - start_time
-            print(f"\n📊 SEND COMPLETE:")
-            print(f"   Success: {success_count}/{len(users)} users")
-            print(f"   Total time: {total_time:.1f}s")
-            print(f"{'='*60}\n")
+            api_logger.info("Sent file %s to %d/%d users in %.1fs", file_id, success_count, len(users), total_time)
             
             message = f"File sent to {success_count}/{len(users)} users in {total_time:.0f}s"
             if failed_users:
@@ -1379,10 +1497,7 @@ async def send_file_now(file_id: str = Body(..., embed=True), chat_id: str = Que
     except HTTPException:
         raise
     except Exception as e:
-        api_logger.error(f"Error in send_file_now: {str(e)}", exc_info=True)
-        print(f"❌ EXCEPTION in send_file_now: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        api_logger.error("Error in send_file_now: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1591,12 +1706,12 @@ async def upload_file(
 ):
     """Upload a new file"""
     try:
-        # Read file data
-        file_data = await file.read()
-        
-        # Save file
-        result = file_manager.save_file(
-            file_data=BytesIO(file_data),
+        # Starlette has already spooled the body to a temp file; copy it
+        # into storage chunk by chunk in a worker thread instead of reading
+        # the whole upload into memory on the event loop
+        result = await asyncio.to_thread(
+            file_manager.save_file,
+            file_data=file.file,
             original_filename=file.filename,
             uploaded_by=payload.get("username", "admin")
         )
@@ -1972,25 +2087,16 @@ async def get_playlists_status(payload: dict = Depends(verify_token)):
 async def reset_playlist(subject: str, payload: dict = Depends(verify_token)):
     """Reset a playlist to start from beginning"""
     try:
-        config = global_repo.get_global_config()
+        config = global_repo.get_global_config(fresh=True)
         if not config:
             raise HTTPException(status_code=500, detail="Global configuration not found")
         
         subject_lower = subject.lower()
         
         # Reset index for the subject
-        if subject_lower == "english":
-            config.english_index = 0
-        elif subject_lower == "history":
-            config.history_index = 0
-        elif subject_lower == "polity":
-            config.polity_index = 0
-        elif subject_lower == "geography":
-            config.geography_index = 0
-        elif subject_lower == "economics":
-            config.economics_index = 0
-        else:
+        if subject_lower not in SUBJECT_FIELDS:
             raise HTTPException(status_code=400, detail="Invalid subject")
+        setattr(config, SUBJECT_FIELDS[subject_lower][1], 0)
         
         global_repo.update_global_config(config)
         
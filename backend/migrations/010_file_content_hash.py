@@ -0,0 +1,49 @@
+"""
+Migration 010: Add content_hash column to files table
+"""
+
+def upgrade(conn):
+    """Add content_hash column and index to files table"""
+    cursor = conn.cursor()
+
+    # Check if column exists
+    cursor.execute("PRAGMA table_info(files)")
+    columns = [row[1] for row in cursor.fetchall()]
+
+    if not columns:
+        print("⚠️ files table not found, skipping")
+        return
+
+    if 'content_hash' not in columns:
+        print("Adding content_hash column to files table...")
+        cursor.execute("""
+            ALTER TABLE files
+            ADD COLUMN content_hash TEXT
+        """)
+        print("✅ Added content_hash column")
+    else:
+        print("✅ content_hash column already exists")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_hash ON files(content_hash)")
+    conn.commit()
+
+def downgrade(conn):
+    """Remove content_hash column (SQLite doesn't support DROP COLUMN easily)"""
+    print("⚠️ Downgrade not supported for this migration")
+    pass
+
+if __name__ == "__main__":
+    import sqlite3
+    import sys
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "officer_priya_multi.db"
+    conn = sqlite3.connect(db_path)
+
+    try:
+        upgrade(conn)
+        print(f"✅ Migration 010 completed for {db_path}")
+    except Exception as e:
+        print(f"❌ Migration 010 failed: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
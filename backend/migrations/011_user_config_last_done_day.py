@@ -0,0 +1,50 @@
+"""
+Migration 011: Add last_done_day column to user_config table
+"""
+
+def upgrade(conn):
+    """Add last_done_day column, which tracks the day the stored streak ends on"""
+    cursor = conn.cursor()
+
+    # Check if column exists
+    cursor.execute("PRAGMA table_info(user_config)")
+    columns = [row[1] for row in cursor.fetchall()]
+
+    if not columns:
+        print("⚠️ user_config table not found, skipping")
+        return
+
+    if 'last_done_day' not in columns:
+        print("Adding last_done_day column to user_config table...")
+        # Left NULL for existing users; their next streak update recounts
+        # from the logs and fills it in
+        cursor.execute("""
+            ALTER TABLE user_config
+            ADD COLUMN last_done_day INTEGER
+        """)
+        print("✅ Added last_done_day column")
+    else:
+        print("✅ last_done_day column already exists")
+
+    conn.commit()
+
+def downgrade(conn):
+    """Remove last_done_day column (SQLite doesn't support DROP COLUMN easily)"""
+    print("⚠️ Downgrade not supported for this migration")
+    pass
+
+if __name__ == "__main__":
+    import sqlite3
+    import sys
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "officer_priya_multi.db"
+    conn = sqlite3.connect(db_path)
+
+    try:
+        upgrade(conn)
+        print(f"✅ Migration 011 completed for {db_path}")
+    except Exception as e:
+        print(f"❌ Migration 011 failed: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
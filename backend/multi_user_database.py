@@ -2,8 +2,10 @@
 
 import sqlite3
 import os
+import threading
 from pathlib import Path
 from typing import Optional
+from db_utils import MMAP_SIZE, CACHE_SIZE_KB
 
 # Check if PostgreSQL is available
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -13,6 +15,7 @@ if USE_POSTGRES:
     try:
         import psycopg2
         from psycopg2.extras import RealDictCursor
+        from psycopg2.pool import ThreadedConnectionPool
         POSTGRES_AVAILABLE = True
     except ImportError:
         print("⚠️  DATABASE_URL set but psycopg2 not installed, falling back to SQLite")
@@ -21,6 +24,62 @@ if USE_POSTGRES:
 else:
     POSTGRES_AVAILABLE = False
 
+# Per-connection SQLite tuning. busy_timeout waits for the writer instead of
+# failing with "database is locked"; NORMAL sync is safe under WAL.
+SQLITE_PRAGMAS = f"""
+    PRAGMA busy_timeout=5000;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size={MMAP_SIZE};
+    PRAGMA cache_size=-{CACHE_SIZE_KB};
+"""
+
+# PostgreSQL connections are pooled per DATABASE_URL and shared by every
+# MultiUserDatabase instance (API, schedulers, bot) in the process
+PG_POOL_MIN = 1
+PG_POOL_MAX = 20
+_pg_pools = {}
+_pg_pools_lock = threading.Lock()
+
+
+def _get_pg_pool(database_url: str):
+    with _pg_pools_lock:
+        pool = _pg_pools.get(database_url)
+        if pool is None:
+            pool = _pg_pools[database_url] = ThreadedConnectionPool(
+                PG_POOL_MIN, PG_POOL_MAX, database_url
+            )
+        return pool
+
+
+def close_pg_pools():
+    """Close all pooled PostgreSQL connections"""
+    with _pg_pools_lock:
+        for pool in _pg_pools.values():
+            pool.closeall()
+        _pg_pools.clear()
+
+
+class PooledConnection:
+    """psycopg2 connection whose close() hands it back to the pool"""
+    
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def close(self):
+        if self._conn is None:
+            return
+        if not self._conn.closed:
+            # Drop anything the caller left uncommitted before reuse
+            self._conn.rollback()
+        self._pool.putconn(self._conn, close=bool(self._conn.closed))
+        self._conn = None
+
+
 class MultiUserDatabase:
     """Database manager for multi-user Officer Priya system - supports SQLite and PostgreSQL"""
     
@@ -41,11 +100,12 @@ class MultiUserDatabase:
     def get_connection(self):
         """Get database connection - returns SQLite or PostgreSQL connection"""
         if self.use_postgres:
-            conn = psycopg2.connect(self.database_url)
-            return conn
+            pool = _get_pg_pool(self.database_url)
+            return PooledConnection(pool, pool.getconn())
         else:
             conn = sqlite3.Connection(self.db_path)
             conn.row_factory = sqlite3.Row
+            conn.executescript(SQLITE_PRAGMAS)
             return conn
     
     def get_cursor(self, conn):
@@ -60,6 +120,9 @@ class MultiUserDatabase:
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # WAL lets readers in worker threads run alongside the writer (persistent setting)
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Users table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS users (
@@ -92,6 +155,7 @@ class MultiUserDatabase:
                 gk_rotation_index INTEGER DEFAULT 0,
                 day_count INTEGER DEFAULT 0,
                 streak INTEGER DEFAULT 0,
+                last_done_day INTEGER,
                 schedule_enabled BOOLEAN DEFAULT 0,
                 schedule_time TEXT DEFAULT '06:00',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -137,6 +201,8 @@ class MultiUserDatabase:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_chat_id ON users(chat_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_logs_user_id ON user_daily_logs(user_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_logs_date ON user_daily_logs(date DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_logs_user_date ON user_daily_logs(user_id, date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_logs_user_day ON user_daily_logs(user_id, day_number DESC)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_config_user_id ON user_config(user_id)")
         
         conn.commit()
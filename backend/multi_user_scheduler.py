@@ -7,7 +7,7 @@ from datetime import datetime, time as dt_time, timedelta
 from dotenv import load_dotenv
 from multi_user_database import MultiUserDatabase
 from user_repository import UserRepository, GlobalRepository, UserDailyLog
-from video_selector import VideoSelector
+from video_selector import VideoSelector, SUBJECT_FIELDS, SUBJECT_EMOJI
 from telegram_bot import TelegramBot
 import pytz
 
@@ -19,12 +19,13 @@ IST = pytz.timezone('Asia/Kolkata')
 class MultiUserScheduler:
     """Schedule and send daily messages automatically - ALL users get SAME content"""
     
-    def __init__(self):
+    def __init__(self, bot: TelegramBot = None):
         self.db = MultiUserDatabase()
         self.user_repo = UserRepository(self.db)
         self.global_repo = GlobalRepository(self.db)
         self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN", "8765768664:AAFK0cbqSnKFfFoNl2a2kJF0g_mdMnoP348")
-        self.bot = TelegramBot(self.bot_token)
+        # Reuse the app's bot (and its connection pool) when given one
+        self.bot = bot or TelegramBot(self.bot_token)
         self.video_selector = VideoSelector()
         self.is_running = False
         self.sent_today = False  # Track if we sent today (global)
@@ -86,13 +87,15 @@ class MultiUserScheduler:
     async def send_daily_message_to_all_users(self):
         """Send SAME content to ALL users"""
         try:
-            today = datetime.now(IST).strftime("%Y-%m-%d")
-            python_weekday = datetime.now(IST).weekday()  # 0=Monday, 6=Sunday
+            # One clock read so the date and weekday always agree
+            now = datetime.now(IST)
+            today = now.strftime("%Y-%m-%d")
+            python_weekday = now.weekday()  # 0=Monday, 6=Sunday
             # Convert to 0=Sunday convention used in database
             today_weekday = (python_weekday + 1) % 7  # 0=Sunday, 1=Monday, 6=Saturday
             
             # Get global config
-            config = self.global_repo.get_global_config()
+            config = self.global_repo.get_global_config(fresh=True)
             if not config:
                 print("❌ No global config found")
                 return False
@@ -100,70 +103,19 @@ class MultiUserScheduler:
             # Collect all playlists scheduled for today
             playlists_to_send = []
             
-            # Check English
-            if self.should_send_playlist_today('english', today, today_weekday):
-                english_num, english_url = self.video_selector.select_next_english(
-                    config.english_index, config.english_playlist
+            for subject, (playlist_field, index_field) in SUBJECT_FIELDS.items():
+                if not self.should_send_playlist_today(subject, today, today_weekday):
+                    continue
+                number, url = self.video_selector.select_next_english(
+                    getattr(config, index_field), getattr(config, playlist_field)
                 )
                 playlists_to_send.append({
-                    'subject': 'English',
-                    'number': english_num,
-                    'url': english_url,
-                    'update_field': 'english_index'
+                    'subject': subject.capitalize(),
+                    'number': number,
+                    'url': url,
+                    'update_field': index_field
                 })
-                config.english_index = english_num
-            
-            # Check History
-            if self.should_send_playlist_today('history', today, today_weekday):
-                history_num, history_url = self.video_selector.select_next_english(
-                    config.history_index, config.history_playlist
-                )
-                playlists_to_send.append({
-                    'subject': 'History',
-                    'number': history_num,
-                    'url': history_url,
-                    'update_field': 'history_index'
-                })
-                config.history_index = history_num
-            
-            # Check Polity
-            if self.should_send_playlist_today('polity', today, today_weekday):
-                polity_num, polity_url = self.video_selector.select_next_english(
-                    config.polity_index, config.polity_playlist
-                )
-                playlists_to_send.append({
-                    'subject': 'Polity',
-                    'number': polity_num,
-                    'url': polity_url,
-                    'update_field': 'polity_index'
-                })
-                config.polity_index = polity_num
-            
-            # Check Geography
-            if self.should_send_playlist_today('geography', today, today_weekday):
-                geography_num, geography_url = self.video_selector.select_next_english(
-                    config.geography_index, config.geography_playlist
-                )
-                playlists_to_send.append({
-                    'subject': 'Geography',
-                    'number': geography_num,
-                    'url': geography_url,
-                    'update_field': 'geography_index'
-                })
-                config.geography_index = geography_num
-            
-            # Check Economics
-            if self.should_send_playlist_today('economics', today, today_weekday):
-                economics_num, economics_url = self.video_selector.select_next_english(
-                    config.economics_index, config.economics_playlist
-                )
-                playlists_to_send.append({
-                    'subject': 'Economics',
-                    'number': economics_num,
-                    'url': economics_url,
-                    'update_field': 'economics_index'
-                })
-                config.economics_index = economics_num
+                setattr(config, index_field, number)
             
             # If no playlists scheduled for today, skip
             if not playlists_to_send:
@@ -180,13 +132,7 @@ class MultiUserScheduler:
             message += "📚 Today's Study Materials:\n\n"
             
             for i, playlist in enumerate(playlists_to_send, 1):
-                emoji = {
-                    'English': '🗣️',
-                    'History': '🏛️',
-                    'Polity': '⚖️',
-                    'Geography': '🌍',
-                    'Economics': '💰'
-                }.get(playlist['subject'], '📚')
+                emoji = SUBJECT_EMOJI.get(playlist['subject'].lower(), '📚')
                 
                 message += f"{i}. {emoji} {playlist['subject']} (Video #{playlist['number']})\n"
                 message += f"   {playlist['url']}\n\n"
@@ -310,4 +256,10 @@ async def main():
         print(f"❌ Fatal error: {e}")
 
 if __name__ == "__main__":
+    # Use uvloop when available (installed with uvicorn[standard])
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
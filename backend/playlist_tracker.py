@@ -8,6 +8,9 @@ import re
 from typing import Optional, Dict
 from logger import app_logger
 
+PLAYLIST_ID_RE = re.compile(r'list=([a-zA-Z0-9_-]+)')
+VIDEO_COUNT_RE = re.compile(r'"videoCount":"(\d+)"')
+
 
 class PlaylistTracker:
     """Track playlist progress and detect completion"""
@@ -34,7 +37,7 @@ class PlaylistTracker:
             return self.cache[playlist_url]
         
         # Extract playlist ID
-        match = re.search(r'list=([a-zA-Z0-9_-]+)', playlist_url)
+        match = PLAYLIST_ID_RE.search(playlist_url)
         if not match:
             return None
         
@@ -65,7 +68,7 @@ class PlaylistTracker:
             response = requests.get(playlist_url, timeout=10)
             if response.status_code == 200:
                 # Look for video count in page
-                match = re.search(r'"videoCount":"(\d+)"', response.text)
+                match = VIDEO_COUNT_RE.search(response.text)
                 if match:
                     count = int(match.group(1))
                     self.cache[playlist_url] = count
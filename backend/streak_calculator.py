@@ -1,6 +1,24 @@
+from bisect import bisect_right
 from typing import List
 from user_repository import UserDailyLog
 
+# Completion message per streak length: the first template whose bound is
+# above the streak is used, the last one has no bound
+STREAK_MOTIVATION_BOUNDS = (2, 7, 14, 30, 60)
+STREAK_MOTIVATION = (
+    "🎉 Great start! First day completed!",
+    "💪 {n} days strong! Keep the momentum!",
+    "🔥 {n} day streak! You're on fire!",
+    "⭐ {n} days! Consistency is your superpower!",
+    "🏆 {n} day streak! Incredible dedication!",
+    "👑 {n} days! You're a legend!",
+)
+
+
+def streak_motivation(streak: int) -> str:
+    """Motivational line shown when a day is marked done"""
+    return STREAK_MOTIVATION[bisect_right(STREAK_MOTIVATION_BOUNDS, streak)].format(n=streak)
+
 
 class StreakCalculator:
     """Calculate and manage study streaks"""
@@ -1,9 +1,45 @@
 import os
 import json
-from typing import Dict, Any
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Any, Optional
 from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.error import RetryAfter
 from telegram.ext import Application
 
+# Telegram allows about 30 messages/second per bot; stay under it for file
+# broadcasts so large fan-outs don't get throttled with 429s
+FILE_SENDS_PER_SECOND = 25
+
+# Telegram file_ids of files we already uploaded, so a file broadcast to many
+# users is uploaded once and then re-sent by reference
+FILE_ID_CACHE_SIZE = 256
+
+
+class SendRateLimiter:
+    """Async token bucket allowing `rate` sends per `period` seconds"""
+    
+    def __init__(self, rate: int, period: float = 1.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate, self._tokens + (now - self._updated) * self.rate / self.period
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
 
 class TelegramBot:
     """Telegram bot for sending messages and handling callbacks"""
@@ -13,12 +49,21 @@ class TelegramBot:
         # Increase connection pool size for parallel file sending
         # pool_size: number of connections in the pool (default 1)
         # max_overflow: additional connections when pool is full (default 0)
+        # The pool is shared by the API handlers and both schedulers, and
+        # keeps connections alive so sends don't pay a new TLS handshake
         from telegram.request import HTTPXRequest
-        request = HTTPXRequest(
-            connection_pool_size=8,  # Allow 8 simultaneous connections
+        self._request = HTTPXRequest(
+            connection_pool_size=16,  # Allow 16 simultaneous connections
             pool_timeout=60.0  # Wait up to 60s for a connection
         )
-        self.bot = Bot(token=token, request=request)
+        self.bot = Bot(token=token, request=self._request)
+        self._file_send_limiter = SendRateLimiter(FILE_SENDS_PER_SECOND)
+        # (path, size, mtime) -> Telegram file_id
+        self._file_ids = OrderedDict()
+    
+    async def close(self):
+        """Close pooled HTTP connections"""
+        await self._request.shutdown()
     
     async def send_daily_message(
         self,
@@ -262,10 +307,46 @@ Mark your completion:"""
         Returns:
             Message response dict
         """
-        import os
+        file_size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as file:
+            return await self._send_file_payload(chat_id, file, file_size, caption, file_type)
+    
+    async def send_file_bytes(
+        self,
+        chat_id: str,
+        file_bytes: bytes,
+        caption: str = None,
+        file_type: str = 'pdf',
+        filename: str = None
+    ) -> Dict[str, Any]:
+        """
+        Send an in-memory file, so a file sent to many users is read from disk once
         
-        # Get file size for timeout calculation
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        Args:
+            chat_id: Telegram chat ID
+            file_bytes: File content
+            caption: Optional caption
+            file_type: Type of file (pdf, jpg, png, doc, etc.)
+            filename: Name shown to the user for documents
+            
+        Returns:
+            Message response dict
+        """
+        return await self._send_file_payload(
+            chat_id, file_bytes, len(file_bytes), caption, file_type, filename
+        )
+    
+    async def _send_file_payload(
+        self,
+        chat_id: str,
+        payload,
+        file_size: int,
+        caption: str = None,
+        file_type: str = 'pdf',
+        filename: str = None
+    ) -> Dict[str, Any]:
+        """Send an open file or bytes as photo/document"""
+        file_size_mb = file_size / (1024 * 1024)
         # Calculate timeout: 30s base + 10s per MB (e.g., 32MB = 30 + 320 = 350s)
         timeout = max(60, int(30 + file_size_mb * 10))
         
@@ -275,26 +356,7 @@ Mark your completion:"""
             # For large files (>20MB), send without buttons to reduce complexity
             if file_size_mb > 20:
                 print(f"  Large file detected, sending without buttons...")
-                if file_type in ['jpg', 'jpeg', 'png']:
-                    with open(file_path, 'rb') as file:
-                        message = await self.bot.send_photo(
-                            chat_id=chat_id,
-                            photo=file,
-                            caption=caption or "📄 CDS Study Material",
-                            read_timeout=timeout,
-                            write_timeout=timeout,
-                            connect_timeout=30
-                        )
-                else:
-                    with open(file_path, 'rb') as file:
-                        message = await self.bot.send_document(
-                            chat_id=chat_id,
-                            document=file,
-                            caption=caption or "📄 CDS Study Material",
-                            read_timeout=timeout,
-                            write_timeout=timeout,
-                            connect_timeout=30
-                        )
+                reply_markup = None
             else:
                 # For smaller files, include buttons
                 keyboard = [
@@ -310,36 +372,43 @@ Mark your completion:"""
                     ]
                 ]
                 reply_markup = InlineKeyboardMarkup(keyboard)
-                
-                if file_type in ['jpg', 'jpeg', 'png']:
-                    with open(file_path, 'rb') as file:
-                        message = await self.bot.send_photo(
-                            chat_id=chat_id,
-                            photo=file,
-                            caption=caption or "📄 CDS Study Material",
-                            reply_markup=reply_markup,
-                            read_timeout=timeout,
-                            write_timeout=timeout,
-                            connect_timeout=30
-                        )
-                else:
-                    with open(file_path, 'rb') as file:
-                        message = await self.bot.send_document(
-                            chat_id=chat_id,
-                            document=file,
-                            caption=caption or "📄 CDS Study Material",
-                            reply_markup=reply_markup,
-                            read_timeout=timeout,
-                            write_timeout=timeout,
-                            connect_timeout=30
-                        )
+            
+            if file_type in ['jpg', 'jpeg', 'png']:
+                message = await self.bot.send_photo(
+                    chat_id=chat_id,
+                    photo=payload,
+                    caption=caption or "📄 CDS Study Material",
+                    reply_markup=reply_markup,
+                    read_timeout=timeout,
+                    write_timeout=timeout,
+                    connect_timeout=30
+                )
+            else:
+                message = await self.bot.send_document(
+                    chat_id=chat_id,
+                    document=payload,
+                    filename=filename,
+                    caption=caption or "📄 CDS Study Material",
+                    reply_markup=reply_markup,
+                    read_timeout=timeout,
+                    write_timeout=timeout,
+                    connect_timeout=30
+                )
             
             print(f"✅ File sent successfully to {chat_id}")
             
+            if message.photo:
+                file_id = message.photo[-1].file_id
+            elif message.document:
+                file_id = message.document.file_id
+            else:
+                file_id = None
+            
             return {
                 "ok": True,
                 "message_id": message.message_id,
-                "chat_id": chat_id
+                "chat_id": chat_id,
+                "file_id": file_id
             }
         except Exception as e:
             print(f"❌ Error sending file to {chat_id}: {str(e)}")
@@ -351,39 +420,72 @@ Mark your completion:"""
         file_path: str,
         caption: str = None,
         file_type: str = 'pdf',
-        max_retries: int = 2
+        max_retries: int = 2,
+        file_bytes: bytes = None,
+        filename: str = None
     ) -> tuple[bool, str]:
         """
         Send file with retry logic
         
+        After the first successful upload of file_path, later sends reuse the
+        Telegram file_id instead of uploading the content again.
+        
         Args:
             chat_id: Telegram chat ID
             file_path: Path to file
             caption: Optional caption
             file_type: Type of file
             max_retries: Maximum number of retry attempts
+            file_bytes: Preloaded file content; sent instead of reading file_path
+            filename: Name shown to the user when sending file_bytes
             
         Returns:
             (success, error_message)
         """
-        import asyncio
-        import os
-        
         # Get file size for better retry logic
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        cache_key = self._file_cache_key(file_path)
+        if file_bytes is not None:
+            file_size = len(file_bytes)
+        elif cache_key is not None:
+            file_size = cache_key[1]
+        else:
+            file_size = os.path.getsize(file_path)
+        file_size_mb = file_size / (1024 * 1024)
         
         for attempt in range(max_retries):
+            remote_id = self._file_ids.get(cache_key) if cache_key else None
             try:
-                await self.send_file(chat_id, file_path, caption, file_type)
+                await self._file_send_limiter.acquire()
+                if remote_id is not None:
+                    # Already uploaded: send by reference instead of re-uploading
+                    result = await self._send_file_payload(
+                        chat_id, remote_id, file_size, caption, file_type
+                    )
+                elif file_bytes is not None:
+                    result = await self.send_file_bytes(
+                        chat_id, file_bytes, caption, file_type,
+                        filename=filename or os.path.basename(str(file_path))
+                    )
+                else:
+                    result = await self.send_file(chat_id, file_path, caption, file_type)
+                self._remember_file_id(cache_key, result.get("file_id"))
                 return True, None
             
             except Exception as e:
                 error_msg = str(e)
                 print(f"❌ Attempt {attempt + 1}/{max_retries} failed for {chat_id}: {error_msg}")
                 
+                if remote_id is not None and not isinstance(e, RetryAfter):
+                    # Stale or rejected file_id: upload the file again on retry
+                    self._file_ids.pop(cache_key, None)
+                
                 if attempt < max_retries - 1:
-                    # Longer wait for large files: 2s for small, 5s for large
-                    wait_time = 2 if file_size_mb < 10 else 5
+                    if isinstance(e, RetryAfter):
+                        # Flood control: wait as long as Telegram asks
+                        wait_time = e.retry_after
+                    else:
+                        # Longer wait for large files: 2s for small, 5s for large
+                        wait_time = 2 if file_size_mb < 10 else 5
                     print(f"⏳ Waiting {wait_time}s before retry...")
                     await asyncio.sleep(wait_time)
                 else:
@@ -392,6 +494,23 @@ Mark your completion:"""
         
         return False, "Max retries exceeded"
     
+    def _file_cache_key(self, file_path: str) -> Optional[tuple]:
+        """Identify a file on disk by path, size and mtime so edits invalidate its file_id"""
+        try:
+            st = os.stat(file_path)
+        except (OSError, TypeError):
+            return None
+        return (str(file_path), st.st_size, st.st_mtime_ns)
+    
+    def _remember_file_id(self, cache_key: Optional[tuple], file_id: Optional[str]):
+        """Store a Telegram file_id, evicting the oldest entries past the cache size"""
+        if cache_key is None or not file_id:
+            return
+        self._file_ids[cache_key] = file_id
+        self._file_ids.move_to_end(cache_key)
+        while len(self._file_ids) > FILE_ID_CACHE_SIZE:
+            self._file_ids.popitem(last=False)
+    
     def handle_interaction_callback(self, callback_query: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse interaction callback data (completed/help)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test incremental streak updates against a full recount
+"""
+
+import sys
+import os
+import random
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(__file__))
+
+from multi_user_database import MultiUserDatabase
+from user_repository import UserRepository, UserDailyLog
+from streak_calculator import StreakCalculator
+
+STATUSES = ["DONE", "DONE", "NOT_DONE", "PENDING"]
+
+
+def print_section(title):
+    print(f"\n{'='*70}")
+    print(f"{title}")
+    print(f"{'='*70}\n")
+
+
+def test_streak_matches_recount():
+    """update_log_status_and_streak must agree with calculate_streak"""
+    print_section("TEST: INCREMENTAL STREAK vs RECOUNT")
+
+    # Scratch database so the real one is never touched
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = MultiUserDatabase(os.path.join(tmp_dir, "streak_test.db"))
+        repo = UserRepository(db)
+        calculator = StreakCalculator()
+        rng = random.Random(20260301)
+
+        user_id = repo.create_user("streak_test", "streak_test", "Streak")
+        latest_day = 0
+        checks = 0
+
+        for step in range(600):
+            action = rng.random()
+            if action < 0.25 or latest_day == 0:
+                # A new day is sent
+                latest_day += 1
+                repo.insert_user_log(UserDailyLog(
+                    user_id=user_id,
+                    day_number=latest_day,
+                    date=f"day-{latest_day}",
+                    english_video_number=latest_day,
+                    gk_subject="English",
+                    gk_video_number=latest_day,
+                    status="PENDING"
+                ))
+                continue
+            if action < 0.27:
+                # Progress reset
+                repo.clear_user_logs(user_id)
+                latest_day = 0
+                continue
+
+            # Mostly mark the newest day (the fast paths), sometimes an older one
+            if rng.random() < 0.7:
+                day = latest_day
+            else:
+                day = rng.randint(1, latest_day)
+            status = rng.choice(STATUSES)
+
+            streak = repo.update_log_status_and_streak(user_id, day, status)
+            expected = calculator.calculate_streak(repo.get_user_logs(user_id))
+            assert streak == expected, (
+                f"step {step}: marking day {day} {status} gave streak {streak}, recount {expected}"
+            )
+            assert repo.get_user_config(user_id).streak == expected
+            checks += 1
+
+        # Marking a day that doesn't exist changes nothing
+        assert repo.update_log_status_and_streak(user_id, latest_day + 1, "DONE") is None
+
+        print(f"✅ {checks} status changes matched the recount")
+        return True
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_all_tests():
+    """Run all streak tests"""
+    tests = [
+        ("Incremental Streak vs Recount", test_streak_matches_recount),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            results.append((test_name, test_func()))
+        except Exception as e:
+            print(f"\n❌ Test '{test_name}' failed: {e}")
+            results.append((test_name, False))
+
+    print_section("TEST SUMMARY")
+    for test_name, result in results:
+        emoji = "✅" if result else "❌"
+        print(f"{emoji} {test_name}")
+
+    return all(result for _, result in results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -6,6 +6,7 @@ Handles user blocking, analytics, and activity tracking
 
 import sqlite3
 from datetime import datetime, timedelta
+from itertools import groupby
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 
@@ -195,40 +196,34 @@ class UserManager:
         
         user_id = user['id']
         
-        # Get daily logs using user_id
+        # Counts and last activity are aggregated in SQL
         cursor.execute("""
-            SELECT status, created_at
+            SELECT
+                COUNT(*) AS total_days,
+                COALESCE(SUM(CASE WHEN status = 'DONE' THEN 1 ELSE 0 END), 0) AS completed_days,
+                (SELECT created_at FROM user_daily_logs
+                 WHERE user_id = ? ORDER BY day_number DESC LIMIT 1) AS last_activity
             FROM user_daily_logs
             WHERE user_id = ?
-            ORDER BY day_number
-        """, (user_id,))
-        
-        logs = cursor.fetchall()
+        """, (user_id, user_id))
+        counts = cursor.fetchone()
         
         # Calculate metrics
-        total_days = len(logs)
-        completed_days = sum(1 for log in logs if log['status'] == 'DONE')
+        total_days = counts['total_days']
+        completed_days = counts['completed_days']
         completion_rate = (completed_days / total_days * 100) if total_days > 0 else 0
         
-        # Calculate streaks
-        current_streak = 0
-        longest_streak = 0
-        temp_streak = 0
-        
-        for log in reversed(logs):
-            if log['status'] == 'DONE':
-                temp_streak += 1
-                longest_streak = max(longest_streak, temp_streak)
-            else:
-                if current_streak == 0:
-                    current_streak = temp_streak
-                temp_streak = 0
-        
-        if temp_streak > 0:
-            current_streak = temp_streak
+        # Calculate streaks from the statuses, newest first, straight off the cursor
+        cursor.execute("""
+            SELECT status
+            FROM user_daily_logs
+            WHERE user_id = ?
+            ORDER BY day_number DESC
+        """, (user_id,))
+        current_streak, longest_streak = self._streaks(log['status'] for log in cursor)
         
         # Get last activity
-        last_activity = logs[-1]['created_at'] if logs else None
+        last_activity = counts['last_activity']
         
         # Check if blocked
         is_blocked = self.is_user_blocked(chat_id)
@@ -248,20 +243,77 @@ class UserManager:
             created_at=datetime.fromisoformat(user['created_at'])
         )
     
+    @staticmethod
+    def _streaks(statuses) -> tuple:
+        """(current, longest) streak from log statuses ordered newest first"""
+        current_streak = 0
+        longest_streak = 0
+        temp_streak = 0
+        
+        for status in statuses:
+            if status == 'DONE':
+                temp_streak += 1
+                longest_streak = max(longest_streak, temp_streak)
+            else:
+                if current_streak == 0:
+                    current_streak = temp_streak
+                temp_streak = 0
+        
+        if temp_streak > 0:
+            current_streak = temp_streak
+        
+        return current_streak, longest_streak
+    
     def get_all_users_analytics(self) -> List[UserActivity]:
-        """Get analytics for all users"""
+        """Get analytics for all users with two queries, however many users there are"""
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT chat_id FROM users")
+        cursor.execute("""
+            SELECT u.id, u.chat_id, u.username, u.created_at,
+                   EXISTS (
+                       SELECT 1 FROM user_blocks b
+                       WHERE b.chat_id = u.chat_id AND b.unblocked_at IS NULL
+                   ) AS is_blocked
+            FROM users u
+            ORDER BY u.chat_id
+        """)
         users = cursor.fetchall()
+        
+        # One pass over every log, grouped by user and newest first, gives
+        # the counts, last activity and streaks for all users
+        cursor.execute("""
+            SELECT user_id, status, created_at
+            FROM user_daily_logs
+            ORDER BY user_id, day_number DESC
+        """)
+        log_stats = {}
+        for user_id, rows in groupby(cursor, key=lambda row: row['user_id']):
+            rows = list(rows)
+            statuses = [row['status'] for row in rows]
+            log_stats[user_id] = (
+                len(statuses), statuses.count('DONE'), rows[0]['created_at'],
+                *self._streaks(statuses)
+            )
         conn.close()
         
         analytics = []
         for user in users:
-            user_analytics = self.get_user_analytics(user['chat_id'])
-            if user_analytics:
-                analytics.append(user_analytics)
+            total_days, completed_days, last_activity, current_streak, longest_streak = \
+                log_stats.get(user['id'], (0, 0, None, 0, 0))
+            completion_rate = (completed_days / total_days * 100) if total_days > 0 else 0
+            analytics.append(UserActivity(
+                chat_id=user['chat_id'],
+                username=user['username'],
+                total_days=total_days,
+                completed_days=completed_days,
+                completion_rate=round(completion_rate, 2),
+                current_streak=current_streak,
+                longest_streak=longest_streak,
+                last_activity=datetime.fromisoformat(last_activity) if last_activity else None,
+                is_blocked=bool(user['is_blocked']),
+                created_at=datetime.fromisoformat(user['created_at'])
+            ))
         
         return analytics
     
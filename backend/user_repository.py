@@ -1,7 +1,12 @@
 """Repository for multi-user operations"""
 
+import asyncio
+import copy
 import sqlite3
-from typing import List, Optional, Dict
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Iterator
 from datetime import datetime
 from multi_user_database import MultiUserDatabase
 
@@ -69,15 +74,88 @@ class UserDailyLog:
         return self.status == "DONE"
 
 
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ttl seconds
+    
+    Every pop/clear bumps `generation`. A reader that loads a value should
+    take the generation before reading and pass it to put(), so a value
+    read before a concurrent invalidation is not cached after it.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key, value, generation: int = None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self.generation += 1
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+
+# Configs are read on nearly every request but only change through the
+# repositories below, so they are cached per process and dropped on every
+# write. This relies on the API, bot and schedulers sharing one process (as
+# deployed by render.yaml); writes from another process are only seen once
+# entries expire, so read-modify-write paths load with fresh=True. Callers
+# get copies, since they mutate configs before saving them.
+CONFIG_CACHE_SIZE = 10000
+CONFIG_CACHE_TTL = 60
+_user_config_cache = TTLCache(CONFIG_CACHE_SIZE, CONFIG_CACHE_TTL)
+_global_config_cache = TTLCache(1, CONFIG_CACHE_TTL)
+
+# Dashboard log counts per user, dropped whenever that user's logs change
+STATS_CACHE_TTL = 300
+_user_stats_cache = TTLCache(CONFIG_CACHE_SIZE, STATS_CACHE_TTL)
+
+# chat_id -> User lookups happen on almost every request and users rows only
+# change through create_user, so found users are kept for an hour and shared
+# by every repository. Misses are not cached so new users show up immediately.
+USER_CACHE_SIZE = 50000
+USER_CACHE_TTL = 3600
+_user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
 class UserRepository:
     """Repository for user operations"""
     
+    LOG_COLUMNS = ("id, user_id, day_number, date, english_video_number, gk_subject, "
+                   "gk_video_number, status, created_at, updated_at")
+    
     def __init__(self, db: MultiUserDatabase):
         self.db = db
     
     # User operations
     def create_user(self, chat_id: str, username: str = "", first_name: str = "", last_name: str = "") -> int:
         """Create new user"""
+        _user_cache.pop((self.db.db_path, chat_id))
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
@@ -124,6 +202,12 @@ class UserRepository:
     
     def get_user_by_chat_id(self, chat_id: str) -> Optional[User]:
         """Get user by chat ID"""
+        key = (self.db.db_path, chat_id)
+        user = _user_cache.get(key)
+        if user is not None:
+            return user
+        
+        generation = _user_cache.generation
         conn = self.db.get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users WHERE chat_id = ?", (chat_id,))
@@ -131,7 +215,7 @@ class UserRepository:
         conn.close()
         
         if row:
-            return User(
+            user = User(
                 id=row["id"],
                 chat_id=row["chat_id"],
                 username=row["username"],
@@ -141,6 +225,8 @@ class UserRepository:
                 created_at=row["created_at"],
                 last_active=row["last_active"]
             )
+            _user_cache.put(key, user, generation)
+            return user
         return None
     
     def get_all_users(self) -> List[User]:
@@ -165,6 +251,50 @@ class UserRepository:
             ))
         return users
     
+    def count_users(self) -> tuple:
+        """Get (total, active) user counts"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) AS total,
+                   COALESCE(SUM(CASE WHEN is_active THEN 1 ELSE 0 END), 0) AS active
+            FROM users
+        """)
+        row = cursor.fetchone()
+        conn.close()
+        return row["total"], row["active"]
+    
+    def get_all_users_iter(self, chunk: int = 500) -> Iterator[List[User]]:
+        """Yield all users in batches of `chunk`, paging by id"""
+        last_id = 0
+        while True:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT * FROM users WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+            
+            if not rows:
+                return
+            
+            yield [User(
+                id=row["id"],
+                chat_id=row["chat_id"],
+                username=row["username"],
+                first_name=row["first_name"],
+                last_name=row["last_name"],
+                is_active=row["is_active"],
+                created_at=row["created_at"],
+                last_active=row["last_active"]
+            ) for row in rows]
+            
+            if len(rows) < chunk:
+                return
+            last_id = rows[-1]["id"]
+    
     def update_last_active(self, user_id: int):
         """Update user's last active timestamp"""
         conn = self.db.get_connection()
@@ -176,8 +306,31 @@ class UserRepository:
         conn.close()
     
     # Config operations
-    def get_user_config(self, user_id: int) -> Optional[UserConfig]:
-        """Get user configuration"""
+    def get_user_config(self, user_id: int, fresh: bool = False) -> Optional[UserConfig]:
+        """Get user configuration
+        
+        Pass fresh=True when the config will be modified and saved, to read
+        the row itself rather than a cached copy.
+        """
+        key = (self.db.db_path, user_id)
+        if not fresh:
+            config = _user_config_cache.get(key)
+            if config is not None:
+                return copy.copy(config)
+        
+        generation = _user_config_cache.generation
+        config = self._fetch_user_config(user_id)
+        if config is not None:
+            _user_config_cache.put(key, copy.copy(config), generation)
+        return config
+    
+    def _invalidate_config(self, user_id: int):
+        _user_config_cache.pop((self.db.db_path, user_id))
+    
+    def _invalidate_stats(self, user_id: int):
+        _user_stats_cache.pop((self.db.db_path, user_id))
+    
+    def _fetch_user_config(self, user_id: int) -> Optional[UserConfig]:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM user_config WHERE user_id = ?", (user_id,))
@@ -205,30 +358,63 @@ class UserRepository:
             )
         return None
     
+    @staticmethod
+    def _update_config(cursor, config: UserConfig):
+        cursor.execute("""
+            UPDATE user_config SET
+                english_playlist = ?, history_playlist = ?, polity_playlist = ?,
+                geography_playlist = ?, economics_playlist = ?,
+                english_index = ?, history_index = ?, polity_index = ?,
+                geography_index = ?, economics_index = ?, gk_rotation_index = ?,
+                day_count = ?, streak = ?, schedule_enabled = ?, schedule_time = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = ?
+        """, (
+            config.english_playlist, config.history_playlist, config.polity_playlist,
+            config.geography_playlist, config.economics_playlist,
+            config.english_index, config.history_index, config.polity_index,
+            config.geography_index, config.economics_index, config.gk_rotation_index,
+            config.day_count, config.streak, config.schedule_enabled, config.schedule_time,
+            config.user_id
+        ))
+    
+    @staticmethod
+    def _update_progress(cursor, config: UserConfig):
+        # Only the columns a daily send advances; leaves streak (owned by
+        # the webhook) and settings untouched
+        cursor.execute("""
+            UPDATE user_config SET
+                english_index = ?, history_index = ?, polity_index = ?,
+                geography_index = ?, economics_index = ?, day_count = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = ?
+        """, (
+            config.english_index, config.history_index, config.polity_index,
+            config.geography_index, config.economics_index, config.day_count,
+            config.user_id
+        ))
+    
+    @staticmethod
+    def _insert_log(cursor, log: UserDailyLog):
+        cursor.execute("""
+            INSERT INTO user_daily_logs (
+                user_id, day_number, date, english_video_number,
+                gk_subject, gk_video_number, status
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            log.user_id, log.day_number, log.date, log.english_video_number,
+            log.gk_subject, log.gk_video_number, log.status
+        ))
+    
     def update_user_config(self, config: UserConfig) -> bool:
         """Update user configuration"""
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
         try:
-            cursor.execute("""
-                UPDATE user_config SET
-                    english_playlist = ?, history_playlist = ?, polity_playlist = ?,
-                    geography_playlist = ?, economics_playlist = ?,
-                    english_index = ?, history_index = ?, polity_index = ?,
-                    geography_index = ?, economics_index = ?, gk_rotation_index = ?,
-                    day_count = ?, streak = ?, schedule_enabled = ?, schedule_time = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE user_id = ?
-            """, (
-                config.english_playlist, config.history_playlist, config.polity_playlist,
-                config.geography_playlist, config.economics_playlist,
-                config.english_index, config.history_index, config.polity_index,
-                config.geography_index, config.economics_index, config.gk_rotation_index,
-                config.day_count, config.streak, config.schedule_enabled, config.schedule_time,
-                config.user_id
-            ))
+            self._update_config(cursor, config)
             conn.commit()
+            self._invalidate_config(config.user_id)
             return True
         except Exception as e:
             conn.rollback()
@@ -243,16 +429,9 @@ class UserRepository:
         cursor = conn.cursor()
         
         try:
-            cursor.execute("""
-                INSERT INTO user_daily_logs (
-                    user_id, day_number, date, english_video_number,
-                    gk_subject, gk_video_number, status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                log.user_id, log.day_number, log.date, log.english_video_number,
-                log.gk_subject, log.gk_video_number, log.status
-            ))
+            self._insert_log(cursor, log)
             conn.commit()
+            self._invalidate_stats(log.user_id)
             return cursor.lastrowid
         except Exception as e:
             conn.rollback()
@@ -260,6 +439,29 @@ class UserRepository:
         finally:
             conn.close()
     
+    def commit_daily(self, log: UserDailyLog, config: UserConfig) -> int:
+        """Insert the day's log, save day count and video indices, and touch
+        last_active in one transaction"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            self._insert_log(cursor, log)
+            log_id = cursor.lastrowid
+            self._update_progress(cursor, config)
+            cursor.execute("""
+                UPDATE users SET last_active = CURRENT_TIMESTAMP WHERE id = ?
+            """, (log.user_id,))
+            conn.commit()
+            self._invalidate_config(config.user_id)
+            self._invalidate_stats(log.user_id)
+            return log_id
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+    
     def update_user_log_status(self, user_id: int, day_number: int, status: str) -> bool:
         """Update log status for user"""
         conn = self.db.get_connection()
@@ -272,6 +474,7 @@ class UserRepository:
                 WHERE user_id = ? AND day_number = ?
             """, (status, user_id, day_number))
             conn.commit()
+            self._invalidate_stats(user_id)
             return cursor.rowcount > 0
         except Exception as e:
             conn.rollback()
@@ -279,33 +482,175 @@ class UserRepository:
         finally:
             conn.close()
     
+    def update_log_status_and_streak(self, user_id: int, day_number: int, status: str) -> Optional[int]:
+        """Update log status and the stored streak in one transaction
+        
+        Marking the newest day extends or ends the run recorded in
+        user_config (streak, last_done_day) without reading other logs;
+        changes to older days, or an unknown run, recount from the logs.
+        
+        Returns the new streak, or None if no log exists for that day.
+        """
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                UPDATE user_daily_logs 
+                SET status = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = ? AND day_number = ?
+            """, (status, user_id, day_number))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return None
+            
+            cursor.execute("""
+                SELECT streak, last_done_day, (
+                    SELECT MAX(day_number) FROM user_daily_logs WHERE user_id = ?
+                ) AS latest_day
+                FROM user_config WHERE user_id = ?
+            """, (user_id, user_id))
+            row = cursor.fetchone()
+            
+            streak = None
+            if row is not None and day_number == row["latest_day"]:
+                if status != 'DONE':
+                    streak, last_done_day = 0, None
+                elif row["last_done_day"] == day_number:
+                    streak, last_done_day = row["streak"], day_number
+                elif row["last_done_day"] == day_number - 1:
+                    streak, last_done_day = row["streak"] + 1, day_number
+            
+            if streak is None:
+                # Streak = DONE days after the most recent day that isn't DONE
+                cursor.execute("""
+                    SELECT COUNT(*) AS streak FROM user_daily_logs
+                    WHERE user_id = ? AND day_number > COALESCE((
+                        SELECT MAX(day_number) FROM user_daily_logs
+                        WHERE user_id = ? AND COALESCE(status, '') <> 'DONE'
+                    ), -1)
+                """, (user_id, user_id))
+                streak = cursor.fetchone()["streak"]
+                # A non-zero streak always ends at the newest day
+                last_done_day = row["latest_day"] if row is not None and streak else None
+            
+            cursor.execute("""
+                UPDATE user_config SET streak = ?, last_done_day = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = ?
+            """, (streak, last_done_day, user_id))
+            conn.commit()
+            self._invalidate_config(user_id)
+            self._invalidate_stats(user_id)
+            return streak
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _row_to_log(row) -> UserDailyLog:
+        return UserDailyLog(
+            id=row["id"],
+            user_id=row["user_id"],
+            day_number=row["day_number"],
+            date=row["date"],
+            english_video_number=row["english_video_number"],
+            gk_subject=row["gk_subject"],
+            gk_video_number=row["gk_video_number"],
+            status=row["status"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+    
     def get_user_logs(self, user_id: int) -> List[UserDailyLog]:
         """Get all logs for user"""
         conn = self.db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM user_daily_logs 
+        cursor.execute(f"""
+            SELECT {self.LOG_COLUMNS} FROM user_daily_logs 
             WHERE user_id = ? 
             ORDER BY day_number DESC
         """, (user_id,))
         rows = cursor.fetchall()
         conn.close()
         
-        logs = []
-        for row in rows:
-            logs.append(UserDailyLog(
-                id=row["id"],
-                user_id=row["user_id"],
-                day_number=row["day_number"],
-                date=row["date"],
-                english_video_number=row["english_video_number"],
-                gk_subject=row["gk_subject"],
-                gk_video_number=row["gk_video_number"],
-                status=row["status"],
-                created_at=row["created_at"],
-                updated_at=row["updated_at"]
-            ))
-        return logs
+        return [self._row_to_log(row) for row in rows]
+    
+    def get_user_logs_page(self, user_id: int, limit: int, offset: int = 0) -> List[UserDailyLog]:
+        """Get one page of logs for user, newest first"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {self.LOG_COLUMNS} FROM user_daily_logs 
+            WHERE user_id = ? 
+            ORDER BY day_number DESC
+            LIMIT ? OFFSET ?
+        """, (user_id, limit, offset))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_log(row) for row in rows]
+    
+    def count_user_logs(self, user_id: int) -> int:
+        """Count logs for user"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) AS total FROM user_daily_logs WHERE user_id = ?", (user_id,)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return row["total"]
+    
+    def get_user_stats(self, user_id: int) -> dict:
+        """Get total/completed log counts overall and for the last 7 days"""
+        key = (self.db.db_path, user_id)
+        stats = _user_stats_cache.get(key)
+        if stats is None:
+            generation = _user_stats_cache.generation
+            stats = self._fetch_user_stats(user_id)
+            _user_stats_cache.put(key, stats, generation)
+        return dict(stats)
+    
+    def _fetch_user_stats(self, user_id: int) -> dict:
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM user_daily_logs WHERE user_id = ?) AS total,
+                (SELECT COUNT(*) FROM user_daily_logs
+                 WHERE user_id = ? AND status = 'DONE') AS done,
+                COUNT(*) AS weekly_total,
+                COALESCE(SUM(CASE WHEN status = 'DONE' THEN 1 ELSE 0 END), 0) AS weekly_done
+            FROM (
+                SELECT status FROM user_daily_logs
+                WHERE user_id = ?
+                ORDER BY day_number DESC
+                LIMIT 7
+            ) AS recent
+        """, (user_id, user_id, user_id))
+        row = cursor.fetchone()
+        conn.close()
+        return {
+            "total": row["total"],
+            "done": row["done"],
+            "weekly_total": row["weekly_total"],
+            "weekly_done": row["weekly_done"]
+        }
+    
+    def log_exists_for_date(self, user_id: int, date: str) -> bool:
+        """Check whether the user already has a log for date"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT EXISTS(
+                SELECT 1 FROM user_daily_logs WHERE user_id = ? AND date = ?
+            ) AS found
+        """, (user_id, date))
+        row = cursor.fetchone()
+        conn.close()
+        return bool(row["found"])
     
     def clear_user_logs(self, user_id: int) -> bool:
         """Clear all logs for user"""
@@ -314,13 +659,63 @@ class UserRepository:
         
         try:
             cursor.execute("DELETE FROM user_daily_logs WHERE user_id = ?", (user_id,))
+            cursor.execute("UPDATE user_config SET last_done_day = NULL WHERE user_id = ?", (user_id,))
             conn.commit()
+            self._invalidate_config(user_id)
+            self._invalidate_stats(user_id)
             return True
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             conn.close()
+    
+    def reset_user_progress(self, config: UserConfig) -> bool:
+        """Clear the user's logs and save their reset config in one transaction"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("DELETE FROM user_daily_logs WHERE user_id = ?", (config.user_id,))
+            self._update_config(cursor, config)
+            cursor.execute("UPDATE user_config SET last_done_day = NULL WHERE user_id = ?", (config.user_id,))
+            conn.commit()
+            self._invalidate_config(config.user_id)
+            self._invalidate_stats(config.user_id)
+            return True
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+    
+    def reset_all_users_progress(self) -> int:
+        """Clear every user's logs and zero their streak and day count in one transaction
+        
+        Returns the number of users reset.
+        """
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("DELETE FROM user_daily_logs")
+            # Rows that are already reset are left alone rather than rewritten
+            cursor.execute("""
+                UPDATE user_config
+                SET streak = 0, day_count = 0, last_done_day = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE streak <> 0 OR day_count <> 0 OR last_done_day IS NOT NULL
+            """)
+            cursor.execute("SELECT COUNT(*) AS total FROM users")
+            total = cursor.fetchone()["total"]
+            conn.commit()
+            _user_config_cache.clear()
+            _user_stats_cache.clear()
+            return total
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
 
     
     # Custom playlist operations
@@ -519,8 +914,24 @@ class GlobalRepository:
     def __init__(self, db: MultiUserDatabase):
         self.db = db
     
-    def get_global_config(self) -> Optional[GlobalConfig]:
-        """Get global configuration"""
+    def get_global_config(self, fresh: bool = False) -> Optional[GlobalConfig]:
+        """Get global configuration
+        
+        Pass fresh=True when the config will be modified and saved, to read
+        the row itself rather than a cached copy.
+        """
+        if not fresh:
+            config = _global_config_cache.get(self.db.db_path)
+            if config is not None:
+                return copy.copy(config)
+        
+        generation = _global_config_cache.generation
+        config = self._fetch_global_config()
+        if config is not None:
+            _global_config_cache.put(self.db.db_path, copy.copy(config), generation)
+        return config
+    
+    def _fetch_global_config(self) -> Optional[GlobalConfig]:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM global_config WHERE id = 1")
@@ -570,6 +981,7 @@ class GlobalRepository:
                 config.schedule_enabled, config.schedule_time
             ))
             conn.commit()
+            _global_config_cache.pop(self.db.db_path)
             return True
         except Exception as e:
             conn.rollback()
@@ -577,6 +989,57 @@ class GlobalRepository:
         finally:
             conn.close()
     
+    def get_all_users_with_stats(self) -> List[dict]:
+        """Get all users with their day count, streak and log count in one query"""
+        return self._query_users_with_stats()
+    
+    def get_users_with_stats_page(self, after: Optional[tuple] = None, limit: int = 500) -> List[dict]:
+        """
+        Get one page of users with stats, newest first
+        
+        Args:
+            after: (created_at, id) of the last row of the previous page
+            limit: Page size
+        """
+        return self._query_users_with_stats(after, limit)
+    
+    def _query_users_with_stats(self, after: Optional[tuple] = None, limit: Optional[int] = None) -> List[dict]:
+        where = ""
+        params = []
+        if after is not None:
+            where = "WHERE u.created_at < ? OR (u.created_at = ? AND u.id < ?)"
+            params += [after[0], after[0], after[1]]
+        limit_clause = ""
+        if limit is not None:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
+        
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT u.id, u.chat_id, u.username, u.first_name, u.last_name,
+                       u.is_active, u.created_at, u.last_active,
+                       COALESCE(c.day_count, 0) AS day_count,
+                       COALESCE(c.streak, 0) AS streak,
+                       COALESCE(l.total_logs, 0) AS total_logs
+                FROM users u
+                LEFT JOIN user_config c ON c.user_id = u.id
+                LEFT JOIN (
+                    -- Count logs per user from the user_id index before joining,
+                    -- instead of grouping the joined user x log rows
+                    SELECT user_id, COUNT(*) AS total_logs
+                    FROM user_daily_logs
+                    GROUP BY user_id
+                ) l ON l.user_id = u.id
+                {where}
+                ORDER BY u.created_at DESC, u.id DESC
+                {limit_clause}
+            """, params)
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+    
     # Global playlist schedule operations
     def get_global_playlist_schedule(self, subject_name: str) -> Optional[dict]:
         """Get schedule for a specific playlist (global)"""
@@ -700,3 +1163,28 @@ class GlobalRepository:
             raise e
         finally:
             conn.close()
+
+
+class AsyncRepository:
+    """Awaitable view of a repository - each call runs in a worker thread
+    
+    Writes are serialized through one lock (SQLite allows a single writer)
+    and concurrent reads are capped by a semaphore.
+    """
+    
+    WRITE_PREFIXES = ('insert_', 'update_', 'upsert_', 'delete_', 'clear_', 'reset_', 'create_', 'commit_')
+    
+    def __init__(self, repo, max_readers: int = 8):
+        self._repo = repo
+        self._write_lock = asyncio.Lock()
+        self._read_slots = asyncio.Semaphore(max_readers)
+    
+    def __getattr__(self, name):
+        method = getattr(self._repo, name)
+        guard = self._write_lock if name.startswith(self.WRITE_PREFIXES) else self._read_slots
+        
+        async def call(*args, **kwargs):
+            async with guard:
+                return await asyncio.to_thread(method, *args, **kwargs)
+        
+        return call
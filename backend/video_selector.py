@@ -1,6 +1,27 @@
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List
 import re
 
+PLAYLIST_ID_RE = re.compile(r'list=([a-zA-Z0-9_-]+)')
+
+# Default subjects -> (playlist field, index field) on UserConfig/GlobalConfig,
+# in send order
+SUBJECT_FIELDS = {
+    "english": ("english_playlist", "english_index"),
+    "history": ("history_playlist", "history_index"),
+    "polity": ("polity_playlist", "polity_index"),
+    "geography": ("geography_playlist", "geography_index"),
+    "economics": ("economics_playlist", "economics_index"),
+}
+
+# Keyed like SUBJECT_FIELDS (lowercase subject names)
+SUBJECT_EMOJI = {
+    "english": "🗣️",
+    "history": "🏛️",
+    "polity": "⚖️",
+    "geography": "🌍",
+    "economics": "💰",
+}
+
 
 class VideoSelector:
     """Video selection and rotation logic"""
@@ -23,6 +44,22 @@ class VideoSelector:
         video_url = self._construct_video_url(playlist_url, next_index)
         return (next_index, video_url)
     
+    def select_next_batch(self, items: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+        """
+        Return the next video for several playlists in one pass
+        
+        Args:
+            items: (current_index, playlist_url) pairs
+            
+        Returns:
+            (video_number, video_url) pairs, in the same order
+        """
+        construct = self._construct_video_url
+        return [
+            (index + 1, construct(playlist_url, index + 1))
+            for index, playlist_url in items
+        ]
+    
     def select_next_gk(
         self,
         rotation_index: int,
@@ -75,7 +112,7 @@ class VideoSelector:
             return f"Video #{video_index}"
         
         # Extract playlist ID from URL
-        match = re.search(r'list=([a-zA-Z0-9_-]+)', playlist_url)
+        match = PLAYLIST_ID_RE.search(playlist_url)
         if match:
             playlist_id = match.group(1)
             return f"https://www.youtube.com/playlist?list={playlist_id}&index={video_index}"
@@ -308,6 +308,7 @@ function FileLibrary({ chatId, authToken }) {
                       <td>
                         <span className={`status-badge status-${schedule.status}`}>
                           {schedule.status === 'pending' && '⏳ Pending'}
+                          {schedule.status === 'sending' && '📤 Sending'}
                           {schedule.status === 'sent' && '✅ Sent'}
                           {schedule.status === 'failed' && '❌ Failed'}
                         </span>